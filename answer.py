@@ -1,5 +1,10 @@
 # Module
+import time
+from typing import AsyncIterator
 from clause import build_clause_prompt, PolicyClause
+from answer_cache import SemanticAnswerCache
+from llm_client import LLM_ERROR_PREFIX
+from timing import record_stage, span
 from pydantic import BaseModel
 from policy_data_model import PolicyChunk
 
@@ -28,22 +33,127 @@ Every factual statement MUST be supported by a citation.
 Citation must refrence policy_id.
 '''
 
+def _to_answer(text: str, clauses: list[PolicyClause]) -> GenerateAnswer:
+    return GenerateAnswer(
+        answer=text,
+        citations=list({
+            c.policy_id for c in clauses
+        })
+    )
+
+
+def _cached_answer(
+        clauses: list[PolicyClause],
+        llm,
+        query_embedding: list[float] | None,
+        answer_cache: SemanticAnswerCache | None
+) -> str | None:
+    if answer_cache is None or query_embedding is None:
+        return None
+    return answer_cache.get(llm.model, clauses, query_embedding)
+
+
+def _cache_answer(
+        clauses: list[PolicyClause],
+        llm,
+        query_embedding: list[float] | None,
+        answer_cache: SemanticAnswerCache | None,
+        text: str
+):
+    # Never reuse a provider failure as an answer
+    if answer_cache is None or query_embedding is None or text.startswith(LLM_ERROR_PREFIX):
+        return
+    answer_cache.put(llm.model, clauses, query_embedding, text)
+
+
 # Answer
 def generate_answer(
         query: str,
         clauses: list[PolicyClause],
-        llm
+        llm,
+        query_embedding: list[float] | None = None,
+        answer_cache: SemanticAnswerCache | None = None
 ) -> GenerateAnswer:
+    """
+    Generate an answer grounded in approved clauses.
+
+    With an answer cache and the query embedding, an earlier answer is
+    reused when it was generated from the identical clause set for a
+    sufficiently similar query, skipping the LLM call.
+    """
+    cached = _cached_answer(clauses, llm, query_embedding, answer_cache)
+    if cached is not None:
+        return _to_answer(cached, clauses)
+
     prompt = build_clause_prompt(query, clauses)
 
-    response = llm.invoke(
-        system_prompt=SYSTEM_PROMPT,
-        user_prompt=prompt
-    )
+    with span("generation"):
+        response = llm.invoke(
+            system_prompt=SYSTEM_PROMPT,
+            user_prompt=prompt
+        )
 
-    return GenerateAnswer(
-        answer=response.text,
-        citations=list({
-            c.policy_id for c in clauses
-        })
-    )
\ No newline at end of file
+    _cache_answer(clauses, llm, query_embedding, answer_cache, response.text)
+    return _to_answer(response.text, clauses)
+
+
+async def agenerate_answer(
+        query: str,
+        clauses: list[PolicyClause],
+        llm,
+        query_embedding: list[float] | None = None,
+        answer_cache: SemanticAnswerCache | None = None
+) -> GenerateAnswer:
+    """Async variant of generate_answer"""
+    cached = _cached_answer(clauses, llm, query_embedding, answer_cache)
+    if cached is not None:
+        return _to_answer(cached, clauses)
+
+    prompt = build_clause_prompt(query, clauses)
+
+    with span("generation"):
+        response = await llm.ainvoke(
+            system_prompt=SYSTEM_PROMPT,
+            user_prompt=prompt
+        )
+
+    _cache_answer(clauses, llm, query_embedding, answer_cache, response.text)
+    return _to_answer(response.text, clauses)
+
+
+async def astream_answer(
+        query: str,
+        clauses: list[PolicyClause],
+        llm,
+        query_embedding: list[float] | None = None,
+        answer_cache: SemanticAnswerCache | None = None
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of agenerate_answer yielding answer text fragments.
+
+    A semantic cache hit is yielded as a single fragment. The streamed
+    answer is cached only once the stream has been fully consumed.
+    """
+    cached = _cached_answer(clauses, llm, query_embedding, answer_cache)
+    if cached is not None:
+        yield cached
+        return
+
+    prompt = build_clause_prompt(query, clauses)
+
+    parts = []
+    started = time.perf_counter()
+    with span("generation"):
+        async for fragment in llm.stream(
+            system_prompt=SYSTEM_PROMPT,
+            user_prompt=prompt
+        ):
+            if not parts:
+                record_stage("first_token", time.perf_counter() - started)
+            parts.append(fragment)
+            yield fragment
+
+    # A mid-stream failure leaves the error text in the answer
+    text = "".join(parts)
+    if LLM_ERROR_PREFIX not in text:
+        _cache_answer(clauses, llm, query_embedding, answer_cache, text)
@@ -0,0 +1,181 @@
+# Semantic Answer Cache - reuse answers for paraphrased queries over the same clauses
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+import numpy as np
+from config import settings
+from policy_data_model import PolicyClause
+
+
+def clause_set_key(clauses: list[PolicyClause]) -> frozenset[tuple[str, str]]:
+    """
+    Order-independent key for an approved clause set.
+
+    Clause text is hashed in alongside the ID so a clause re-upserted
+    with new wording never matches answers generated from the old text.
+    """
+    return frozenset(
+        (c.clause_id, hashlib.sha256(c.text.encode("utf-8")).hexdigest())
+        for c in clauses
+    )
+
+
+class _Bucket:
+    """Ring buffer of (unit query vector, answer) for one clause set"""
+
+    def __init__(self, dimension: int, capacity: int):
+        self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self.answers: list[str] = []
+        self.next = 0
+
+    def add(self, vector: np.ndarray, answer: str):
+        if len(self.answers) < len(self.vectors):
+            self.answers.append(answer)
+        else:
+            self.answers[self.next] = answer
+        self.vectors[self.next] = vector
+        self.next = (self.next + 1) % len(self.vectors)
+
+    def best(self, vector: np.ndarray) -> tuple[float, Optional[str]]:
+        n = len(self.answers)
+        if n == 0:
+            return -1.0, None
+        scores = self.vectors[:n] @ vector
+        i = int(np.argmax(scores))
+        return float(scores[i]), self.answers[i]
+
+
+class SemanticAnswerCache:
+    """
+    Answer cache keyed by (model, approved clause set), matched by query similarity.
+
+    An earlier answer is reused only when it was generated by the same model
+    from exactly the same clause set and its query embedding is within
+    similarity_threshold (cosine) of the new query. Buckets are evicted
+    least recently used; each bucket keeps its newest bucket_size answers.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.92,
+        max_buckets: int = 10_000,
+        bucket_size: int = 32
+    ):
+        """
+        Initialize semantic answer cache.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity to reuse an answer
+            max_buckets: Maximum distinct (model, clause set) buckets
+            bucket_size: Answers kept per bucket
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_buckets = max_buckets
+        self.bucket_size = bucket_size
+        self._buckets: OrderedDict[tuple, _Bucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _unit(embedding: list[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+
+    def get(
+        self,
+        model: str,
+        clauses: list[PolicyClause],
+        query_embedding: list[float]
+    ) -> Optional[str]:
+        """
+        Find a reusable answer.
+
+        Args:
+            model: LLM model name
+            clauses: Approved clauses the answer must be grounded in
+            query_embedding: Embedding of the new query
+
+        Returns:
+            Cached answer text, or None on a miss
+        """
+        vector = self._unit(query_embedding)
+        key = (model, clause_set_key(clauses))
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if vector is None or bucket is None:
+                self.misses += 1
+                return None
+
+            self._buckets.move_to_end(key)
+            score, answer = bucket.best(vector)
+            if score < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return answer
+
+    def put(
+        self,
+        model: str,
+        clauses: list[PolicyClause],
+        query_embedding: list[float],
+        answer: str
+    ):
+        """
+        Store a generated answer.
+
+        Args:
+            model: LLM model name
+            clauses: Approved clauses the answer was generated from
+            query_embedding: Embedding of the query that was answered
+            answer: Generated answer text
+        """
+        vector = self._unit(query_embedding)
+        if vector is None:
+            return
+        key = (model, clause_set_key(clauses))
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = _Bucket(len(vector), self.bucket_size)
+                self._buckets[key] = bucket
+            self._buckets.move_to_end(key)
+            bucket.add(vector, answer)
+
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and size"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "buckets": len(self._buckets)
+            }
+
+
+def create_answer_cache() -> Optional[SemanticAnswerCache]:
+    """
+    Build the semantic answer cache from config.
+
+    Returns:
+        SemanticAnswerCache, or None if disabled
+    """
+    if not settings.answer_cache_enabled:
+        return None
+
+    return SemanticAnswerCache(
+        similarity_threshold=settings.answer_cache_similarity_threshold,
+        max_buckets=settings.answer_cache_max_buckets,
+        bucket_size=settings.answer_cache_bucket_size
+    )
@@ -1,87 +1,463 @@
 # Modules
-from fastapi import FastAPI
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator
+from fastapi import FastAPI, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from uuid import uuid4
 from datetime import datetime
-from audit import AuditRecord
-from clause import retrieve_validate_clauses
+from audit import AuditRecord, AuditQuery
+from audit_store import create_audit_sink
+from answer_cache import create_answer_cache
+from clause import aretrieve_validate_clauses
+from config import settings
+from decision_cache import CachedDecision, create_decision_cache, request_key
 from decision_status import DecisionStatus
-from retriever_model import RetrievalRequest
-from answer import generate_answer
-from llm_client import get_llm_client
+from retriever import abuild_retrieval_context, aretrieve_validate_policies_shared, retrieval_context
+from retriever_model import RetrievalRequest, RetrievalContext
+from policy_data_model import PolicyChunk, PolicyClause
+from validate_result import ValidationResult
+from answer import agenerate_answer, astream_answer
+from llm_client import LLM_ERROR_PREFIX, get_llm_client
+from vector_store import close_vector_store, get_vector_store
+from timing import current_timings, histograms, record_stage, span, start_timings, timings_ms
 
-app = FastAPI()
 
-# In-memory audit store (will be replaced with database later)
-audit_store: dict[str, AuditRecord] = {}
+# Audit sink (configured via AUDIT_BACKEND)
+audit_sink = create_audit_sink()
 
+# Decision cache (None if DECISION_CACHE_ENABLED=false)
+decision_cache = create_decision_cache()
 
-def persist_audit_record(record: AuditRecord):
+# Semantic answer cache (None if ANSWER_CACHE_ENABLED=false)
+answer_cache = create_answer_cache()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await audit_sink.start()
+    yield
+    # Flush queued audit records and release async HTTP clients
+    await audit_sink.close()
+    await close_vector_store()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+async def persist_audit_record(record: AuditRecord):
     """
-    Persist audit record to in-memory store.
+    Persist audit record to the configured audit sink.
 
-    In production, this would write to PostgreSQL.
-    For now, stores in memory for demonstration.
+    Durable sinks commit in the background unless strict durability
+    is enabled, in which case this waits for the commit.
 
     Args:
         record: AuditRecord to persist
     """
-    audit_store[record.audit_id] = record
-    print(f"[AUDIT] Stored record {record.audit_id}: {record.decision_status}")
+    with span("audit"):
+        await audit_sink.persist(record)
 
 
-# Initialize LLM client
-llm_client = get_llm_client("openai", "gpt-4o-mini")
+async def persist_audit_records(records: list[AuditRecord]):
+    """
+    Persist several audit records, waiting at most once for a strict commit.
 
-@app.post("/answer")
-def answer_question(request: RetrievalRequest):
-    audit_id = str(uuid4())
-    timestamp = datetime.utcnow()
+    Args:
+        records: AuditRecords to persist
+    """
+    with span("audit"):
+        await audit_sink.persist_many(records)
+
+
+# Initialize LLM client (configured via LLM_PROVIDER / LLM_MODEL)
+llm_client = get_llm_client(settings.llm_provider, settings.llm_model)
+
+
+def build_audit_record(
+    audit_id: str,
+    request: RetrievalRequest,
+    decision: CachedDecision,
+    cached_from: str | None = None,
+    timings: dict[str, float] | None = None
+) -> AuditRecord:
+    """
+    Build an audit record for a decision.
+
+    Args:
+        audit_id: Audit ID for this request
+        request: Retrieval request being answered
+        decision: Decision computed for (or reused by) the request
+        cached_from: Audit ID of the original decision on a cache hit
+        timings: Stage timings in seconds (defaults to the current request's)
+
+    Returns:
+        AuditRecord timestamped now
+    """
+    return AuditRecord(
+        audit_id=audit_id,
+        timestamp=datetime.utcnow(),
+        query=request.query,
+        role=request.role,
+        jurisdiction=request.jurisdiction,
+        as_of_date=request.as_of_date,
+        decision_status=decision.decision_status,
+        decision_reason=decision.decision_reason,
+        policy_ids=decision.policy_ids,
+        clause_ids=decision.clause_ids,
+        answer=decision.answer,
+        cached_from=cached_from,
+        timings_ms=timings_ms(timings if timings is not None else current_timings())
+    )
+
+
+async def retrieve_decision(
+    request: RetrievalRequest,
+    audit_id: str,
+    context: RetrievalContext | None = None,
+    policy_result: tuple[ValidationResult, list[PolicyChunk]] | None = None
+) -> tuple[CachedDecision, RetrievalContext, list[PolicyClause]]:
+    """
+    Run retrieval and validation for a request.
+
+    Args:
+        request: Retrieval request
+        audit_id: Audit ID the decision will be recorded under
+        context: Precomputed retrieval context (embeds the query if None)
+        policy_result: Precomputed policy validation and resolved policies
 
-    validation, clauses = retrieve_validate_clauses(request)
+    Returns:
+        Tuple of (decision without answer, retrieval context, approved clauses)
+    """
+    context = context or await abuild_retrieval_context(request)
+    validation, clauses = await aretrieve_validate_clauses(request, context, policy_result)
 
     # Failure path
     if validation.status != DecisionStatus.SAFE:
-        record = AuditRecord(
+        decision = CachedDecision(
             audit_id=audit_id,
-            timestamp=timestamp,
-            query=request.query,
-            role=request.role,
-            jurisdiction=request.jurisdiction,
-            as_of_date=request.as_of_date,
+            validation=validation,
             decision_status=validation.status,
             decision_reason=validation.reason,
             policy_ids=validation.supporting_policy_ids,
             clause_ids=[],
             answer=None
         )
-        persist_audit_record(record)
-        return record
-
-    # Success path
-    answer = generate_answer(
-        query=request.query,
-        clauses=clauses,
-        llm=llm_client
-    )
+        return decision, context, []
 
-    record = AuditRecord(
+    decision = CachedDecision(
         audit_id=audit_id,
-        timestamp=timestamp,
-        query=request.query,
-        role=request.role,
-        jurisdiction=request.jurisdiction,
-        as_of_date=request.as_of_date,
+        validation=validation,
         decision_status=DecisionStatus.SAFE,
         decision_reason="Answer generated from validated clauses",
         policy_ids=list({c.policy_id for c in clauses}),
         clause_ids=[c.clause_id for c in clauses],
-        answer=answer.answer
+        answer=None
     )
+    return decision, context, clauses
+
+
+async def answer_decision(
+    request: RetrievalRequest,
+    decision: CachedDecision,
+    context: RetrievalContext,
+    clauses: list[PolicyClause]
+) -> CachedDecision:
+    """
+    Generate the answer for a SAFE decision.
+
+    Args:
+        request: Retrieval request
+        decision: Decision from retrieve_decision
+        context: Retrieval context from retrieve_decision
+        clauses: Approved clauses from retrieve_decision
+
+    Returns:
+        The decision with its answer filled in
+    """
+    if decision.decision_status != DecisionStatus.SAFE:
+        return decision
+
+    # Success path
+    answer = await agenerate_answer(
+        query=request.query,
+        clauses=clauses,
+        llm=llm_client,
+        query_embedding=context.query_embedding,
+        answer_cache=answer_cache
+    )
+    decision.answer = answer.answer
+    return decision
+
+
+async def compute_decision(
+    request: RetrievalRequest,
+    audit_id: str
+) -> tuple[CachedDecision, RetrievalContext]:
+    """
+    Run retrieval, validation and generation for a request.
+
+    Args:
+        request: Retrieval request
+        audit_id: Audit ID the decision will be recorded under
+
+    Returns:
+        Tuple of (CachedDecision, retrieval context)
+    """
+    decision, context, clauses = await retrieve_decision(request, audit_id)
+    return await answer_decision(request, decision, context, clauses), context
+
+
+def cache_decision(
+    request: RetrievalRequest,
+    corpus_version: int,
+    decision: CachedDecision,
+    context: RetrievalContext
+):
+    """Cache a decision unless it came from a failed embedding or LLM call"""
+    if decision_cache is None or context.embedding_failed:
+        return
+    if LLM_ERROR_PREFIX not in (decision.answer or ""):
+        decision_cache.put(request, corpus_version, decision)
+
+
+@app.post("/answer")
+async def answer_question(request: RetrievalRequest):
+    start_timings()
+
+    # Read the version before computing so a concurrent upsert
+    # can't get a stale decision cached under the new version
+    corpus_version = get_vector_store().corpus_version
+
+    with span("total"):
+        cached = None
+        if decision_cache is not None:
+            cached = decision_cache.get(request, corpus_version)
+
+        if cached is None:
+            audit_id = str(uuid4())
+            decision, context = await compute_decision(request, audit_id)
+
+    if cached is not None:
+        record = build_audit_record(
+            str(uuid4()), request, cached, cached_from=cached.audit_id
+        )
+        await persist_audit_record(record)
+        return record
+
+    record = build_audit_record(audit_id, request, decision)
+    await persist_audit_record(record)
+
+    # Transient embedding and LLM failures are not cached
+    cache_decision(request, corpus_version, decision, context)
 
-    persist_audit_record(record)
     return record
 
 
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def decision_event(record: AuditRecord) -> dict:
+    """Decision fields sent before any answer text"""
+    return {
+        "audit_id": record.audit_id,
+        "decision_status": record.decision_status.value,
+        "decision_reason": record.decision_reason,
+        "policy_ids": record.policy_ids,
+        "clause_ids": record.clause_ids,
+        "cached_from": record.cached_from
+    }
+
+
+async def stream_answer_events(request: RetrievalRequest) -> AsyncIterator[str]:
+    """
+    Answer a request as a stream of Server-Sent Events.
+
+    Events:
+        decision: status, reason, policy_ids and clause_ids, sent right after retrieval
+        token: {"text": ...} answer fragments as the LLM produces them
+        done: the finalized audit record
+    """
+    start_timings()
+    started = time.perf_counter()
+    corpus_version = get_vector_store().corpus_version
+
+    if decision_cache is not None:
+        cached = decision_cache.get(request, corpus_version)
+        if cached is not None:
+            record_stage("total", time.perf_counter() - started)
+            record = build_audit_record(
+                str(uuid4()), request, cached, cached_from=cached.audit_id
+            )
+            await persist_audit_record(record)
+            yield sse_event("decision", decision_event(record))
+            if record.answer:
+                yield sse_event("token", {"text": record.answer})
+            yield sse_event("done", record.model_dump(mode="json"))
+            return
+
+    audit_id = str(uuid4())
+    decision, context, clauses = await retrieve_decision(request, audit_id)
+    yield sse_event("decision", decision_event(build_audit_record(audit_id, request, decision)))
+
+    complete = True
+    if decision.decision_status == DecisionStatus.SAFE:
+        parts = []
+        complete = False
+        try:
+            async for fragment in astream_answer(
+                query=request.query,
+                clauses=clauses,
+                llm=llm_client,
+                query_embedding=context.query_embedding,
+                answer_cache=answer_cache
+            ):
+                parts.append(fragment)
+                yield sse_event("token", {"text": fragment})
+            complete = True
+        finally:
+            # Finalize the audit record even if the client disconnects
+            decision.answer = "".join(parts)
+            if not complete:
+                decision.decision_reason = "Answer stream ended before completion"
+                record_stage("total", time.perf_counter() - started)
+                await persist_audit_record(build_audit_record(audit_id, request, decision))
+
+    record_stage("total", time.perf_counter() - started)
+    record = build_audit_record(audit_id, request, decision)
+    await persist_audit_record(record)
+
+    cache_decision(request, corpus_version, decision, context)
+
+    yield sse_event("done", record.model_dump(mode="json"))
+
+
+@app.post("/answer/stream")
+async def answer_question_stream(request: RetrievalRequest):
+    return StreamingResponse(
+        stream_answer_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/answer/batch")
+async def answer_batch(requests: list[RetrievalRequest]):
+    """
+    Answer many requests in one call.
+
+    Requests that normalize to the same retrieval context are computed
+    once; their duplicates (and decision cache hits) get their own audit
+    record with cached_from set. All uncached queries are embedded in one
+    batch call, retrieval runs concurrently and LLM calls are capped at
+    ANSWER_BATCH_LLM_CONCURRENCY.
+    """
+    if len(requests) > settings.answer_batch_max_size:
+        return {"error": f"Batch size {len(requests)} exceeds limit of {settings.answer_batch_max_size}"}
+
+    corpus_version = get_vector_store().corpus_version
+
+    # Group identical retrieval contexts
+    groups: dict[tuple, list[int]] = {}
+    for i, request in enumerate(requests):
+        groups.setdefault(request_key(request), []).append(i)
+
+    decisions: dict[tuple, CachedDecision] = {}
+    pending = []
+    for key, indexes in groups.items():
+        cached = None
+        if decision_cache is not None:
+            cached = decision_cache.get(requests[indexes[0]], corpus_version)
+        if cached is not None:
+            decisions[key] = cached
+        else:
+            pending.append(key)
+
+    # One embedding call for every uncached query
+    with span("embed"):
+        embeddings = await get_vector_store().aembed_batch(
+            [requests[groups[key][0]].query for key in pending]
+        )
+
+    retrieval_limit = asyncio.Semaphore(settings.answer_batch_retrieval_concurrency)
+    llm_limit = asyncio.Semaphore(settings.answer_batch_llm_concurrency)
+
+    # Requests with the same query text share one policy candidate set
+    by_query: dict[str, list[int]] = {}
+    for n, key in enumerate(pending):
+        by_query.setdefault(requests[groups[key][0]].query, []).append(n)
+
+    policy_results: dict[tuple, tuple] = {}
+
+    async def share_policies(members: list[int]):
+        async with retrieval_limit:
+            shared = await aretrieve_validate_policies_shared(
+                [requests[groups[pending[n]][0]] for n in members],
+                embeddings[members[0]]
+            )
+        for n, result in zip(members, shared):
+            if result is not None:
+                policy_results[pending[n]] = result
+
+    await asyncio.gather(*(
+        share_policies(members) for members in by_query.values() if len(members) > 1
+    ))
+
+    # Each decide() runs as its own task, so its timings stay separate
+    group_timings: dict[tuple, dict[str, float]] = {}
+
+    async def decide(key: tuple, embedding: list[float]) -> CachedDecision:
+        group_timings[key] = start_timings()
+        request = requests[groups[key][0]]
+        context = retrieval_context(request, embedding)
+        with span("total"):
+            async with retrieval_limit:
+                decision, context, clauses = await retrieve_decision(
+                    request, str(uuid4()), context, policy_results.get(key)
+                )
+            async with llm_limit:
+                decision = await answer_decision(request, decision, context, clauses)
+        cache_decision(request, corpus_version, decision, context)
+        return decision
+
+    computed = await asyncio.gather(*(
+        decide(key, embedding) for key, embedding in zip(pending, embeddings)
+    ))
+    decisions.update(zip(pending, computed))
+
+    # Computed decisions keep their audit ID for the first request of the group
+    fresh = {decision.audit_id for decision in computed}
+    records: list[AuditRecord | None] = [None] * len(requests)
+    for key, indexes in groups.items():
+        decision = decisions[key]
+        for i in indexes:
+            if decision.audit_id in fresh:
+                fresh.discard(decision.audit_id)
+                records[i] = build_audit_record(
+                    decision.audit_id, requests[i], decision, timings=group_timings[key]
+                )
+            else:
+                records[i] = build_audit_record(
+                    str(uuid4()), requests[i], decision, cached_from=decision.audit_id, timings={}
+                )
+
+    await persist_audit_records(records)
+
+    return records
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus-style stage duration histograms"""
+    if histograms is None:
+        return PlainTextResponse("# metrics disabled, set METRICS_ENABLED=true\n", status_code=404)
+    return PlainTextResponse(histograms.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
@@ -101,17 +477,23 @@ def seed_test_data():
 
 
 @app.get("/audit/{audit_id}")
-def get_audit_record(audit_id: str):
+async def get_audit_record(audit_id: str):
     """Retrieve a specific audit record by ID"""
-    if audit_id in audit_store:
-        return audit_store[audit_id]
+    record = await audit_sink.get(audit_id)
+    if record is not None:
+        return record
     return {"error": "Audit record not found"}
 
 
 @app.get("/audit")
-def list_audit_records():
-    """List all audit records (for testing/demo)"""
-    return {
-        "total_records": len(audit_store),
-        "records": list(audit_store.values())
-    }
\ No newline at end of file
+async def list_audit_records(query: Annotated[AuditQuery, Query()]):
+    """
+    Page through audit records, newest first.
+
+    Filter by time range, decision_status, jurisdiction, role, policy_id or
+    clause_id; pass next_cursor from the previous page to continue.
+    """
+    try:
+        return await audit_sink.query(query)
+    except ValueError as e:
+        return {"error": str(e)}
\ No newline at end of file
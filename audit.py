@@ -1,6 +1,6 @@
 # Modules
 from datetime import date, datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from decision_status import DecisionStatus
 
 # Audit
@@ -23,4 +23,29 @@ class AuditRecord(BaseModel):
     clause_ids: list[str]
 
     # Output
-    answer: str | None
\ No newline at end of file
+    answer: str | None
+
+    # Audit ID of the decision this one was served from (decision cache hit)
+    cached_from: str | None = None
+
+    # Pipeline stage durations for this request (audit persistence excluded)
+    timings_ms: dict[str, float] = {}
+
+
+# Audit query (all filters optional, combined with AND)
+class AuditQuery(BaseModel):
+    start_time: datetime | None = None
+    end_time: datetime | None = None
+    decision_status: DecisionStatus | None = None
+    jurisdiction: str | None = None
+    role: str | None = None
+    policy_id: str | None = None
+    clause_id: str | None = None
+
+    # Pagination (newest first)
+    cursor: str | None = None
+    limit: int = Field(default=100, ge=1, le=1000)
+
+class AuditPage(BaseModel):
+    records: list[AuditRecord]
+    next_cursor: str | None
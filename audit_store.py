@@ -0,0 +1,502 @@
+# Audit Store - pluggable, append-only audit sinks
+import asyncio
+import base64
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+import aiosqlite
+from audit import AuditRecord, AuditQuery, AuditPage
+from config import settings
+
+
+def _timestamp_key(timestamp: datetime) -> str:
+    """Sortable timestamp text (naive UTC ISO format)"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp.isoformat()
+
+
+def encode_cursor(record: AuditRecord) -> str:
+    """Opaque keyset cursor positioned after record"""
+    raw = f"{_timestamp_key(record.timestamp)}|{record.audit_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """
+    Decode a cursor into its (timestamp key, audit_id) position.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        timestamp, audit_id = raw.split("|", 1)
+        datetime.fromisoformat(timestamp)
+    except Exception:
+        raise ValueError(f"Invalid audit cursor: {cursor}")
+    return timestamp, audit_id
+
+
+class AuditSink(ABC):
+    """Abstract base class for audit record persistence"""
+
+    async def start(self):
+        """Open connections and start background work (called at app startup)"""
+        pass
+
+    async def close(self):
+        """Flush pending records and release resources (called at shutdown)"""
+        pass
+
+    @abstractmethod
+    async def persist(self, record: AuditRecord):
+        """
+        Append an audit record.
+
+        Args:
+            record: AuditRecord to persist
+        """
+        pass
+
+    async def persist_many(self, records: list[AuditRecord]):
+        """
+        Append several audit records.
+
+        Sinks that commit in the background override this to wait once for
+        the whole list instead of once per record.
+
+        Args:
+            records: AuditRecords to persist
+        """
+        for record in records:
+            await self.persist(record)
+
+    @abstractmethod
+    async def get(self, audit_id: str) -> Optional[AuditRecord]:
+        """
+        Fetch a record by ID.
+
+        Args:
+            audit_id: Audit record ID
+
+        Returns:
+            AuditRecord, or None if not found
+        """
+        pass
+
+    @abstractmethod
+    async def query(self, query: AuditQuery) -> AuditPage:
+        """
+        Page through records matching the filters, newest first.
+
+        Args:
+            query: Filters, cursor and page size
+
+        Returns:
+            AuditPage with next_cursor set when more records remain
+        """
+        pass
+
+
+class MemoryAuditSink(AuditSink):
+    """In-memory sink for demos and tests, bounded to the newest max_records"""
+
+    def __init__(self, max_records: int = 100_000):
+        self.max_records = max_records
+        self._records: OrderedDict[str, AuditRecord] = OrderedDict()
+
+    async def persist(self, record: AuditRecord):
+        self._records[record.audit_id] = record
+        while len(self._records) > self.max_records:
+            self._records.popitem(last=False)
+
+    async def get(self, audit_id: str) -> Optional[AuditRecord]:
+        return self._records.get(audit_id)
+
+    async def query(self, query: AuditQuery) -> AuditPage:
+        # Linear scan; the SQLite sink serves these filters from indexes
+        after = decode_cursor(query.cursor) if query.cursor else None
+        start = _timestamp_key(query.start_time) if query.start_time else None
+        end = _timestamp_key(query.end_time) if query.end_time else None
+
+        matches = []
+        for record in self._records.values():
+            position = (_timestamp_key(record.timestamp), record.audit_id)
+            if after and position >= after:
+                continue
+            if start and position[0] < start:
+                continue
+            if end and position[0] >= end:
+                continue
+            if query.decision_status and record.decision_status != query.decision_status:
+                continue
+            if query.jurisdiction and record.jurisdiction != query.jurisdiction:
+                continue
+            if query.role and record.role != query.role:
+                continue
+            if query.policy_id and query.policy_id not in record.policy_ids:
+                continue
+            if query.clause_id and query.clause_id not in record.clause_ids:
+                continue
+            matches.append((position, record))
+
+        matches.sort(key=lambda match: match[0], reverse=True)
+        records = [record for _, record in matches[:query.limit + 1]]
+        return _build_page(records, query.limit)
+
+
+class SQLiteAuditSink(AuditSink):
+    """
+    Append-only SQLite sink with a background group-commit writer.
+
+    persist() puts records on a bounded queue and returns without touching
+    the database (callers wait only if the queue is full). The writer drains
+    the queue in batches of up to batch_size, committing at least every
+    flush_interval_ms. In strict mode persist() waits until the batch holding
+    the record is committed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval_ms: float = 50.0,
+        queue_size: int = 10_000,
+        batch_size: int = 500,
+        strict: bool = False,
+        max_retries: int = 3
+    ):
+        """
+        Initialize SQLite audit sink.
+
+        Args:
+            path: SQLite database file
+            flush_interval_ms: Maximum time a record waits before commit
+            queue_size: Bound on queued, uncommitted records
+            batch_size: Maximum records per commit
+            strict: Wait for commit in persist()
+            max_retries: Commit attempts before a batch is reported lost
+        """
+        self.path = path
+        self.flush_interval = flush_interval_ms / 1000
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.strict = strict
+        self.max_retries = max_retries
+
+        self._db: Optional[aiosqlite.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._closing = False
+
+        # Batch the writer is gathering or committing, failed if the writer dies
+        self._inflight: list[tuple[AuditRecord, Optional[asyncio.Future]]] = []
+
+        # Records accepted but not yet committed, so reads see them
+        self._pending: dict[str, AuditRecord] = {}
+
+    async def start(self):
+        self._db = await aiosqlite.connect(self.path)
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS audit_records (
+                audit_id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                decision_status TEXT NOT NULL,
+                jurisdiction TEXT NOT NULL,
+                role TEXT NOT NULL,
+                payload TEXT NOT NULL
+            )
+        """)
+        await self._create_indexes()
+        await self._db.commit()
+
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._closing = False
+        self._start_writer()
+
+    def _start_writer(self):
+        self._writer = asyncio.create_task(self._write_loop())
+        self._writer.add_done_callback(self._writer_done)
+
+    def _writer_done(self, task: asyncio.Task):
+        """
+        Handle a writer that stopped without the close() sentinel.
+
+        Records the writer held are failed so strict callers don't hang.
+        The writer is restarted unless the sink is closing or the task was
+        cancelled; then queued records are failed too, which also unblocks
+        a close() waiting to enqueue its sentinel.
+        """
+        if not task.cancelled() and task.exception() is None:
+            return
+
+        reason = "cancelled" if task.cancelled() else repr(task.exception())
+        print(f"[AUDIT] Writer stopped: {reason}")
+        error = RuntimeError(f"Audit writer stopped: {reason}")
+        self._settle(self._inflight, error)
+        self._inflight = []
+
+        if self._closing or task.cancelled():
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not None:
+                    self._settle([item], error)
+        else:
+            self._start_writer()
+
+    async def close(self):
+        if self._writer is not None:
+            self._closing = True
+            if not self._writer.done():
+                # Sentinel tells the writer to drain and exit
+                await self._queue.put(None)
+            await asyncio.wait([self._writer])
+            self._writer = None
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    def _require_started(self):
+        if self._queue is None or self._db is None:
+            raise RuntimeError("SQLite audit sink not started (or already closed); call start() first")
+
+    async def persist(self, record: AuditRecord):
+        self._require_started()
+        committed = asyncio.get_running_loop().create_future() if self.strict else None
+        self._pending[record.audit_id] = record
+        await self._queue.put((record, committed))
+        if committed is not None:
+            await committed
+
+    async def persist_many(self, records: list[AuditRecord]):
+        # Enqueue everything first so strict mode waits for the commits once
+        self._require_started()
+        waiters = []
+        for record in records:
+            committed = asyncio.get_running_loop().create_future() if self.strict else None
+            self._pending[record.audit_id] = record
+            await self._queue.put((record, committed))
+            if committed is not None:
+                waiters.append(committed)
+        if waiters:
+            await asyncio.gather(*waiters)
+
+    async def get(self, audit_id: str) -> Optional[AuditRecord]:
+        if audit_id in self._pending:
+            return self._pending[audit_id]
+
+        self._require_started()
+        async with self._db.execute(
+            "SELECT payload FROM audit_records WHERE audit_id = ?",
+            (audit_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return AuditRecord.model_validate_json(row[0]) if row else None
+
+    async def query(self, query: AuditQuery) -> AuditPage:
+        """
+        Keyset-paginated query over committed records.
+
+        Every filter has an index ordered by (timestamp, audit_id). A single
+        filter (or none) reads about limit index entries per page whatever
+        the log size; combined filters walk one index and check the others
+        per row, so a page costs more the rarer the combination is.
+        Records become queryable once committed (within the flush interval).
+        """
+        self._require_started()
+        sql = "SELECT r.payload FROM audit_records r"
+        conditions, params = [], []
+
+        # Policy/clause filters walk their link table's index in time order
+        if query.policy_id:
+            sql += " JOIN audit_policies p ON p.audit_id = r.audit_id AND p.policy_id = ?"
+            params.append(query.policy_id)
+        if query.clause_id:
+            sql += " JOIN audit_clauses c ON c.audit_id = r.audit_id AND c.clause_id = ?"
+            params.append(query.clause_id)
+
+        for column in ("decision_status", "jurisdiction", "role"):
+            value = getattr(query, column)
+            if value is not None:
+                conditions.append(f"r.{column} = ?")
+                params.append(value.value if column == "decision_status" else value)
+
+        if query.start_time:
+            conditions.append("r.timestamp >= ?")
+            params.append(_timestamp_key(query.start_time))
+        if query.end_time:
+            conditions.append("r.timestamp < ?")
+            params.append(_timestamp_key(query.end_time))
+        if query.cursor:
+            conditions.append("(r.timestamp, r.audit_id) < (?, ?)")
+            params.extend(decode_cursor(query.cursor))
+
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY r.timestamp DESC, r.audit_id DESC LIMIT ?"
+        params.append(query.limit + 1)
+
+        async with self._db.execute(sql, params) as cursor:
+            rows = await cursor.fetchall()
+
+        records = [AuditRecord.model_validate_json(row[0]) for row in rows]
+        return _build_page(records, query.limit)
+
+    async def _create_indexes(self):
+        """Secondary indexes and evidence link tables for audit queries"""
+        await self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_audit_time ON audit_records (timestamp, audit_id)"
+        )
+        for column in ("decision_status", "jurisdiction", "role"):
+            await self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_audit_{column} "
+                f"ON audit_records ({column}, timestamp, audit_id)"
+            )
+
+        for table, column in (("audit_policies", "policy_id"), ("audit_clauses", "clause_id")):
+            await self._db.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {column} TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    audit_id TEXT NOT NULL,
+                    PRIMARY KEY ({column}, timestamp, audit_id)
+                ) WITHOUT ROWID
+            """)
+            await self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_audit ON {table} (audit_id)"
+            )
+
+    async def _write_loop(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = self._inflight = [item]
+
+            # Gather more records until the batch is full or the interval ends
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._commit(batch)
+            self._inflight = []
+
+    async def _commit(self, batch: list[tuple[AuditRecord, Optional[asyncio.Future]]]):
+        error = None
+        try:
+            await self._insert_with_retries(batch)
+        except Exception as e:
+            error = e
+            print(f"[AUDIT] Failed to commit {len(batch)} records: {e}")
+        self._settle(batch, error)
+
+    async def _insert_with_retries(self, batch: list[tuple[AuditRecord, Optional[asyncio.Future]]]):
+        """Insert and commit a batch, raising the last error after max_retries attempts"""
+        rows = [
+            (
+                record.audit_id,
+                _timestamp_key(record.timestamp),
+                record.decision_status.value,
+                record.jurisdiction,
+                record.role,
+                record.model_dump_json()
+            )
+            for record, _ in batch
+        ]
+        policy_links = [
+            (policy_id, _timestamp_key(record.timestamp), record.audit_id)
+            for record, _ in batch
+            for policy_id in set(record.policy_ids)
+        ]
+        clause_links = [
+            (clause_id, _timestamp_key(record.timestamp), record.audit_id)
+            for record, _ in batch
+            for clause_id in set(record.clause_ids)
+        ]
+
+        for attempt in range(self.max_retries):
+            try:
+                await self._db.executemany(
+                    "INSERT OR IGNORE INTO audit_records "
+                    "(audit_id, timestamp, decision_status, jurisdiction, role, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                await self._db.executemany(
+                    "INSERT OR IGNORE INTO audit_policies (policy_id, timestamp, audit_id) VALUES (?, ?, ?)",
+                    policy_links
+                )
+                await self._db.executemany(
+                    "INSERT OR IGNORE INTO audit_clauses (clause_id, timestamp, audit_id) VALUES (?, ?, ?)",
+                    clause_links
+                )
+                await self._db.commit()
+                return
+            except Exception:
+                try:
+                    await self._db.rollback()
+                except Exception as e:
+                    print(f"[AUDIT] Rollback failed: {e}")
+                if attempt == self.max_retries - 1:
+                    raise
+                await asyncio.sleep(self.flush_interval * (attempt + 1))
+
+    def _settle(
+        self,
+        batch: list[tuple[AuditRecord, Optional[asyncio.Future]]],
+        error: Optional[BaseException]
+    ):
+        """Drop records from the pending view and resolve strict-mode waiters"""
+        for record, committed in batch:
+            self._pending.pop(record.audit_id, None)
+            if committed is not None and not committed.done():
+                if error is None:
+                    committed.set_result(None)
+                else:
+                    committed.set_exception(error)
+
+
+def _build_page(records: list[AuditRecord], limit: int) -> AuditPage:
+    """Page from up to limit + 1 newest-first records (the extra signals more)"""
+    if len(records) > limit:
+        records = records[:limit]
+        return AuditPage(records=records, next_cursor=encode_cursor(records[-1]))
+    return AuditPage(records=records, next_cursor=None)
+
+
+def create_audit_sink(backend: Optional[str] = None) -> AuditSink:
+    """
+    Factory function to build the configured audit sink.
+
+    Args:
+        backend: Sink backend ("memory" or "sqlite"), defaults to config
+
+    Returns:
+        AuditSink instance (call start() before use)
+    """
+    backend = (backend or settings.audit_backend).lower()
+    if backend == "memory":
+        return MemoryAuditSink(max_records=settings.audit_memory_max_records)
+    elif backend == "sqlite":
+        return SQLiteAuditSink(
+            path=settings.audit_db_path,
+            flush_interval_ms=settings.audit_flush_interval_ms,
+            queue_size=settings.audit_queue_size,
+            batch_size=settings.audit_batch_size,
+            strict=settings.audit_strict_durability
+        )
+    else:
+        raise ValueError(f"Unsupported audit backend: {backend}")
@@ -1,4 +1,5 @@
 # Modules 
+import numpy as np
 from retriever_model import RetrievalRequest
 from policy_data_model import PolicyChunk, PolicyMetadata
 from validate_result import ValidationResult
@@ -17,6 +18,16 @@ def is_applicable(metadata: PolicyMetadata, request: RetrievalRequest) -> bool:
     
     return True
 
+# Applicability as a store-side metadata filter (same rules as is_applicable)
+def applicability_filter(request: RetrievalRequest) -> dict:
+    as_of = request.as_of_date.toordinal()
+
+    return {
+        "jurisdiction": {"$eq": request.jurisdiction},
+        "effective_from_ord": {"$lte": as_of},
+        "effective_to_ord": {"$gte": as_of}
+    }
+
 # Authority Resolution Logic
 def resolve_authority(chunks: list[PolicyChunk]) -> list[PolicyChunk]:
     if not chunks:
@@ -31,6 +42,92 @@ def resolve_authority(chunks: list[PolicyChunk]) -> list[PolicyChunk]:
         if chunk.metadata.authority_level == max_authority
     ]
 
+# Union of several requests' applicability filters (a superset of each)
+def shared_applicability_filter(requests: list[RetrievalRequest]) -> dict:
+    as_of = [r.as_of_date.toordinal() for r in requests]
+
+    return {
+        "jurisdiction": {"$in": sorted({r.jurisdiction for r in requests})},
+        "effective_from_ord": {"$lte": max(as_of)},
+        "effective_to_ord": {"$gte": min(as_of)}
+    }
+
+# Columnar candidate set: applicability and authority as array operations
+class PolicyCandidates:
+    """
+    Scored policy candidates as NumPy columns.
+
+    items are the underlying store matches in descending score order; the
+    columns are aligned with them. Applicability is a boolean mask and
+    authority resolution a max plus an equality mask, so candidates can be
+    filtered before any PolicyChunk is built, and many (jurisdiction,
+    as_of_date) pairs can be checked in one pass.
+    """
+
+    def __init__(
+        self,
+        items: list,
+        scores: list[float],
+        jurisdictions: list[str],
+        authority_levels: list[int],
+        effective_from_ords: list[int],
+        effective_to_ords: list[int]
+    ):
+        self.items = items
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self._codes: dict[str, int] = {}
+        self.jurisdiction_codes = np.fromiter(
+            (self._codes.setdefault(j, len(self._codes)) for j in jurisdictions),
+            dtype=np.int32,
+            count=len(jurisdictions)
+        )
+        self.authority_levels = np.asarray(authority_levels, dtype=np.int64)
+        self.effective_from_ords = np.asarray(effective_from_ords, dtype=np.int64)
+        self.effective_to_ords = np.asarray(effective_to_ords, dtype=np.int64)
+
+    @classmethod
+    def from_metadata(cls, items: list, metadata: list[dict], scores: list[float]) -> "PolicyCandidates":
+        """Build from stored policy chunk metadata (as written by the vector store)"""
+        return cls(
+            items=items,
+            scores=scores,
+            jurisdictions=[m["jurisdiction"] for m in metadata],
+            authority_levels=[m["authority_level"] for m in metadata],
+            effective_from_ords=[m["effective_from_ord"] for m in metadata],
+            effective_to_ords=[m["effective_to_ord"] for m in metadata]
+        )
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def applicable_masks(self, requests: list[RetrievalRequest]) -> np.ndarray:
+        """(len(requests), len(candidates)) applicability masks in one broadcast (same rules as is_applicable)"""
+        codes = np.array([self._codes.get(r.jurisdiction, -1) for r in requests], dtype=np.int32)
+        as_of = np.array([r.as_of_date.toordinal() for r in requests], dtype=np.int64)
+        return (
+            (self.jurisdiction_codes == codes[:, None])
+            & (self.effective_from_ords <= as_of[:, None])
+            & (self.effective_to_ords >= as_of[:, None])
+        )
+
+    def resolve_authority(self, indexes: np.ndarray | None = None) -> np.ndarray:
+        """
+        Keep the highest-authority candidates.
+
+        Args:
+            indexes: Candidate indexes to resolve among (all if None)
+
+        Returns:
+            Indexes at the maximum authority level, in score order
+        """
+        if indexes is None:
+            indexes = np.arange(len(self))
+        if len(indexes) == 0:
+            return indexes
+
+        levels = self.authority_levels[indexes]
+        return indexes[levels == levels.max()]
+
 # Detect conflict
 def detect_conflict(policies: list[PolicyChunk]) -> ValidationResult | None:
     if len(policies) <= 1:
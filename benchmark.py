@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency and throughput benchmark for the /answer endpoint.
+
+Generates a synthetic policy/clause corpus and query workload, ingests the
+corpus, then drives the FastAPI app with closed-loop (fixed concurrency) and
+open-loop (Poisson arrivals at a fixed rate) load. Reports p50/p95/p99
+latency overall and per pipeline stage, QPS and the decision status mix,
+and writes everything to a JSON file for tracking regressions.
+
+By default the app runs in-process on the local vector store, embedder and
+LLM, so no keys or network are needed:
+
+    python benchmark.py --clauses 10000 --queries 1000
+    python benchmark.py --clauses 100000 --mode open --rate 200
+
+Embeddings are held as Python float lists on the corpus models (about
+12 KB per 384-dimensional vector before the store copies them), so keep
+--clauses within about 100k unless the machine has memory to spare.
+
+Per-stage timings come from the timings_ms field of each returned audit
+record, so they are also available when --url drives a running server.
+
+--recall-queries measures recall@10 of the local HNSW index against exact
+search over the clause embeddings, for each --ef-search value:
+
+    python benchmark.py --clauses 20000 --recall-queries 200 --mode none
+    python benchmark.py --clauses 100000 --index hnsw --queries 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Optional
+import numpy as np
+
+
+ROLES = ["customer", "agent", "supervisor", "admin"]
+CLAUSE_TYPES = ["allow", "deny", "require", "limit", "define"]
+AUTHORITY_LEVELS = [1, 2, 3, 4]
+AUTHORITY_WEIGHTS = [0.4, 0.3, 0.2, 0.1]
+
+VOCABULARY = """
+refund return exchange purchase order product item package shipping delivery
+customer member premium standard digital physical software license ebook
+subscription account payment card credit invoice receipt warranty defect damage
+repair replacement store online days weeks business original unopened opened
+downloaded accessed eligible request approve deny process issue within after
+before period window fee charge cost free label carrier tracking address region
+international domestic holiday promotion discount coupon gift bundle sale final
+clearance manager approval escalation exception verification identity fraud
+chargeback dispute cancellation renewal trial upgrade downgrade prorated balance
+""".split()
+
+
+# Corpus generation
+
+def generate_corpus(
+    num_clauses: int,
+    clauses_per_policy: int = 5,
+    policies_per_jurisdiction: int = 10,
+    seed: int = 0
+):
+    """
+    Build a synthetic corpus of policy chunks and clauses.
+
+    Each policy draws its words from a small topic subset of the vocabulary,
+    so clauses of one policy are mutually similar and distinct from other
+    topics. Authority levels, effective windows, roles and overrides are
+    randomised to exercise every validation path.
+
+    Args:
+        num_clauses: Total number of clauses to generate
+        clauses_per_policy: Clauses per policy
+        policies_per_jurisdiction: Average policies sharing a jurisdiction
+            (the candidate set authority resolution sees per request)
+        seed: Random seed
+
+    Returns:
+        Tuple of (policy chunks, clauses)
+    """
+    from policy_data_model import PolicyChunk, PolicyClause, PolicyMetadata
+
+    rng = random.Random(seed)
+    num_policies = max(1, num_clauses // clauses_per_policy)
+    num_jurisdictions = max(1, num_policies // policies_per_jurisdiction)
+    jurisdictions = [f"J{i:05d}" for i in range(num_jurisdictions)]
+
+    chunks, clauses = [], []
+    for p in range(num_policies):
+        policy_id = f"POL-{p:07d}"
+        topic = rng.sample(VOCABULARY, 24)
+
+        effective_from = date(2022, 1, 1) + timedelta(days=rng.randrange(3 * 365))
+        effective_to = None
+        if rng.random() < 0.2:
+            effective_to = effective_from + timedelta(days=rng.randrange(90, 720))
+
+        policy_clauses = []
+        for c in range(clauses_per_policy):
+            clause_id = f"{policy_id}-C{c + 1}"
+            overrides = []
+            if policy_clauses and rng.random() < 0.05:
+                overrides = [rng.choice(policy_clauses).clause_id]
+
+            policy_clauses.append(PolicyClause(
+                clause_id=clause_id,
+                policy_id=policy_id,
+                text=" ".join(rng.choices(topic, k=rng.randint(12, 20))),
+                clause_type=rng.choice(CLAUSE_TYPES),
+                overrides=overrides,
+                applies_to_roles=rng.sample(ROLES, rng.randint(1, len(ROLES)))
+            ))
+
+        chunks.append(PolicyChunk(
+            text=" ".join(c.text for c in policy_clauses),
+            metadata=PolicyMetadata(
+                policy_id=policy_id,
+                authority_level=rng.choices(AUTHORITY_LEVELS, AUTHORITY_WEIGHTS)[0],
+                jurisdiction=rng.choice(jurisdictions),
+                effective_from=effective_from,
+                effective_to=effective_to
+            ),
+            embedding=[]
+        ))
+        clauses.extend(policy_clauses)
+
+    return chunks, clauses
+
+
+def generate_workload(
+    chunks,
+    num_queries: int,
+    perturb: float = 0.1,
+    zipf_s: float = 1.1,
+    seed: int = 1
+) -> list[dict]:
+    """
+    Build /answer request bodies from the corpus.
+
+    Policies are picked with Zipf-distributed popularity so hot questions
+    repeat, and each query is a policy's text with a fraction of its words
+    dropped to simulate paraphrase. Workloads with different seeds share
+    the same popularity ranking, like successive days of real traffic.
+
+    Args:
+        chunks: Policy chunks from generate_corpus
+        num_queries: Number of requests
+        perturb: Fraction of words dropped from each query
+        zipf_s: Zipf exponent for policy popularity (higher = more repeats)
+        seed: Random seed
+
+    Returns:
+        List of request bodies
+    """
+    weights = [1 / (rank + 1) ** zipf_s for rank in range(len(chunks))]
+    order = list(range(len(chunks)))
+    random.Random(0).shuffle(order)
+    rng = random.Random(seed)
+
+    workload = []
+    for i in rng.choices(order, weights=weights, k=num_queries):
+        chunk = chunks[i]
+        words = [w for w in chunk.text.split() if rng.random() >= perturb]
+        metadata = chunk.metadata
+        end = metadata.effective_to or date(2025, 12, 31)
+        as_of = metadata.effective_from + timedelta(
+            days=rng.randrange(max(1, (end - metadata.effective_from).days))
+        )
+        workload.append({
+            "query": " ".join(words),
+            "jurisdiction": metadata.jurisdiction,
+            "as_of_date": as_of.isoformat(),
+            "role": rng.choice(ROLES)
+        })
+    return workload
+
+
+def reset_caches():
+    """Start a run with cold decision and answer caches"""
+    import app as app_module
+    from answer_cache import create_answer_cache
+    from decision_cache import create_decision_cache
+
+    app_module.decision_cache = create_decision_cache()
+    app_module.answer_cache = create_answer_cache()
+
+
+def latency_summary(values: list[float]) -> dict:
+    """Percentiles in milliseconds"""
+    if not values:
+        return {"count": 0}
+    ms = np.asarray(values) * 1000
+    return {
+        "count": len(values),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3)
+    }
+
+
+# Load drivers
+
+class RunStats:
+    """Latencies, decision statuses and stage timings of one run"""
+
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.statuses = Counter()
+        self.stages: dict[str, list[float]] = {}
+
+    def add_timings(self, timings_ms: dict[str, float]):
+        for stage, ms in timings_ms.items():
+            self.stages.setdefault(stage, []).append(ms / 1000)
+
+
+async def _send(client, body: dict, stats: RunStats, start: float):
+    try:
+        response = await client.post("/answer", json=body)
+        if response.status_code == 200:
+            record = response.json()
+            stats.statuses[record.get("decision_status")] += 1
+            stats.add_timings(record.get("timings_ms", {}))
+        else:
+            stats.statuses[f"http_{response.status_code}"] += 1
+    except Exception as e:
+        stats.statuses[f"error_{type(e).__name__}"] += 1
+    stats.latencies.append(time.perf_counter() - start)
+
+
+async def closed_loop(client, workload: list[dict], concurrency: int) -> dict:
+    """
+    Closed-loop load: concurrency workers each send their next request as
+    soon as the previous one completes.
+    """
+    stats = RunStats()
+    queue = iter(workload)
+
+    async def worker():
+        for body in queue:
+            await _send(client, body, stats, time.perf_counter())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return _run_result("closed", {"concurrency": concurrency}, stats, elapsed)
+
+
+async def open_loop(client, workload: list[dict], rate: float, seed: int = 2) -> dict:
+    """
+    Open-loop load: requests arrive as a Poisson process at rate per second
+    regardless of completions. Latency is measured from each request's
+    scheduled arrival, so queueing delay is not hidden (no coordinated
+    omission).
+    """
+    stats = RunStats()
+    rng = random.Random(seed)
+    tasks = []
+
+    started = time.perf_counter()
+    scheduled = started
+    for body in workload:
+        scheduled += rng.expovariate(rate)
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_send(client, body, stats, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    return _run_result("open", {"target_qps": rate}, stats, elapsed)
+
+
+def _run_result(mode: str, params: dict, stats: RunStats, elapsed: float) -> dict:
+    return {
+        "mode": mode,
+        **params,
+        "requests": len(stats.latencies),
+        "duration_s": round(elapsed, 3),
+        "qps": round(len(stats.latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency": latency_summary(stats.latencies),
+        "stages": {stage: latency_summary(values) for stage, values in sorted(stats.stages.items())},
+        "decision_status": dict(stats.statuses)
+    }
+
+
+# Index recall
+
+def measure_recall(
+    clauses,
+    queries: list[str],
+    ef_values: list[int],
+    m: int = 16,
+    ef_construction: int = 100,
+    k: int = 10
+) -> dict:
+    """
+    Recall@k of an HNSW index over the clause embeddings versus exact search.
+
+    Args:
+        clauses: Clauses from generate_corpus
+        queries: Query texts
+        ef_values: ef_search values to evaluate
+        m: HNSW links per node
+        ef_construction: HNSW construction beam width
+        k: Neighbours compared per query
+
+    Returns:
+        Build time, exact search latency and recall/latency per ef_search
+    """
+    from embedder import create_embedder
+    from hnsw import HNSWIndex
+
+    embedder = create_embedder()
+    vectors = np.asarray(embedder.embed([c.text for c in clauses]), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    query_vectors = np.asarray(embedder.embed(queries), dtype=np.float32)
+    k = min(k, len(vectors))
+
+    index = HNSWIndex(vectors.shape[1], m=m, ef_construction=ef_construction)
+    started = time.perf_counter()
+    for row, vector in enumerate(vectors):
+        index.add(row, vector)
+    build_s = time.perf_counter() - started
+
+    exact, exact_latencies = [], []
+    for query in query_vectors:
+        started = time.perf_counter()
+        scores = vectors @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        exact_latencies.append(time.perf_counter() - started)
+        exact.append(set(top.tolist()))
+
+    results = {
+        "k": k,
+        "m": m,
+        "ef_construction": ef_construction,
+        "build_s": round(build_s, 3),
+        "exact": latency_summary(exact_latencies),
+        "hnsw": []
+    }
+    for ef in ef_values:
+        hits, latencies = 0, []
+        for query, truth in zip(query_vectors, exact):
+            started = time.perf_counter()
+            labels, _ = index.search(query, k, ef=ef)
+            latencies.append(time.perf_counter() - started)
+            hits += len(truth.intersection(labels.tolist()))
+        results["hnsw"].append({
+            "ef_search": ef,
+            "recall": round(hits / (k * len(queries)), 4),
+            "latency": latency_summary(latencies)
+        })
+    return results
+
+
+# Runner
+
+def configure_environment(args):
+    """Select offline providers before config is imported"""
+    if args.url:
+        return
+    os.environ.setdefault("VECTOR_BACKEND", "local")
+    os.environ.setdefault("EMBEDDING_PROVIDER", "local")
+    os.environ.setdefault("LLM_PROVIDER", "local")
+    os.environ.setdefault("AUDIT_BACKEND", "memory")
+    os.environ.setdefault("EMBEDDING_CACHE_PATH", "")
+    os.environ["LOCAL_VECTOR_STORE_PATH"] = ""
+    os.environ["LOCAL_VECTOR_INDEX"] = args.index
+    os.environ["HNSW_M"] = str(args.hnsw_m)
+    os.environ["HNSW_EF_CONSTRUCTION"] = str(args.ef_construction)
+    os.environ["LOCAL_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["LOCAL_LLM_TOKEN_LATENCY_MS"] = str(args.llm_token_latency_ms)
+    if args.no_cache:
+        os.environ["DECISION_CACHE_ENABLED"] = "false"
+        os.environ["ANSWER_CACHE_ENABLED"] = "false"
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run(args) -> dict:
+    import httpx
+
+    chunks, clauses = generate_corpus(
+        args.clauses, args.clauses_per_policy, args.policies_per_jurisdiction, args.seed
+    )
+
+    results = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "args": vars(args),
+        "corpus": {"policies": len(chunks), "clauses": len(clauses)},
+        "runs": []
+    }
+
+    if args.recall_queries and not args.url:
+        queries = [
+            body["query"]
+            for body in generate_workload(chunks, args.recall_queries, args.perturb, args.zipf, seed=args.seed + 100)
+        ]
+        print(f"[BENCH] Building HNSW index over {len(clauses)} clauses for recall...")
+        recall = measure_recall(clauses, queries, args.ef_search, args.hnsw_m, args.ef_construction)
+        results["recall"] = recall
+        print(f"[BENCH] hnsw build {recall['build_s']:.1f} s  exact p50 {recall['exact']['p50_ms']:.3f} ms")
+        for row in recall["hnsw"]:
+            print(
+                f"[BENCH] ef_search {row['ef_search']:>5}: recall@{recall['k']} {row['recall']:.4f}  "
+                f"p50 {row['latency']['p50_ms']:.3f} ms  p99 {row['latency']['p99_ms']:.3f} ms"
+            )
+
+    if args.mode == "none":
+        return results
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=None)
+        lifespan = None
+    else:
+        import app as app_module
+        from vector_store import get_vector_store
+
+        print(f"[BENCH] Ingesting {len(chunks)} policies and {len(clauses)} clauses...")
+        started = time.perf_counter()
+        ingested = get_vector_store().ingest(chunks=chunks, clauses=clauses, progress=lambda done, total: None)
+        failed = ingested["failed_ids"]
+        if failed["policies"] or failed["clauses"]:
+            raise RuntimeError(
+                f"Ingest failed for {len(failed['policies'])} policies and {len(failed['clauses'])} clauses"
+            )
+        results["corpus"]["ingest_s"] = round(time.perf_counter() - started, 3)
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app_module.app),
+            base_url="http://benchmark",
+            timeout=None
+        )
+        lifespan = app_module.app.router.lifespan_context(app_module.app)
+
+    if lifespan is not None:
+        await lifespan.__aenter__()
+    try:
+        drivers = []
+        if args.mode in ("closed", "both"):
+            drivers += [(closed_loop, c) for c in args.concurrency]
+        if args.mode in ("open", "both"):
+            drivers += [(open_loop, r) for r in args.rate]
+
+        for run_index, (driver, param) in enumerate(drivers):
+            # Fresh queries and cold caches per run so runs are comparable
+            workload = generate_workload(
+                chunks, args.warmup + args.queries, args.perturb, args.zipf,
+                seed=args.seed + 1 + run_index
+            )
+            if not args.url:
+                reset_caches()
+            if args.warmup:
+                await closed_loop(client, workload[:args.warmup], 1)
+
+            result = await driver(client, workload[args.warmup:], param)
+            results["runs"].append(result)
+
+            latency = result["latency"]
+            print(
+                f"[BENCH] {result['mode']:6s} {param:>8}: {result['qps']:>9.2f} qps  "
+                f"p50 {latency.get('p50_ms', 0):>8.2f} ms  "
+                f"p95 {latency.get('p95_ms', 0):>8.2f} ms  "
+                f"p99 {latency.get('p99_ms', 0):>8.2f} ms"
+            )
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    return results
+
+
+def parse_args(argv=None):
+    def numbers(kind):
+        return lambda value: [kind(v) for v in value.split(",")]
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clauses", type=int, default=1000, help="Corpus size in clauses (1k to 100k)")
+    parser.add_argument("--clauses-per-policy", type=int, default=5)
+    parser.add_argument("--policies-per-jurisdiction", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500, help="Requests per run")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured warmup requests")
+    parser.add_argument("--perturb", type=float, default=0.1, help="Fraction of query words dropped")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Popularity skew of queried policies")
+    parser.add_argument("--mode", choices=["closed", "open", "both", "none"], default="both", help="Load drivers to run (none: recall only)")
+    parser.add_argument("--concurrency", type=numbers(int), default=[1, 8, 32], help="Closed-loop concurrency levels, e.g. 1,8,32")
+    parser.add_argument("--rate", type=numbers(float), default=[50.0], help="Open-loop arrival rates in qps, e.g. 50,200")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Local LLM time to first token")
+    parser.add_argument("--llm-token-latency-ms", type=float, default=0.0, help="Local LLM per-token latency")
+    parser.add_argument("--no-cache", action="store_true", help="Disable decision and answer caches")
+    parser.add_argument("--index", choices=["exact", "hnsw"], default="exact", help="Local vector store index for load runs")
+    parser.add_argument("--hnsw-m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=100)
+    parser.add_argument("--recall-queries", type=int, default=0, help="Queries for the HNSW recall@10 measurement (0 to skip)")
+    parser.add_argument("--ef-search", type=numbers(int), default=[16, 32, 64, 128], help="ef_search values for the recall measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", default=None, help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--output", default="benchmark_results.json", help="Path of the JSON results file")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+
+    results = asyncio.run(run(args))
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"[BENCH] Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
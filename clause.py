@@ -2,8 +2,15 @@
 from policy_data_model import PolicyClause, PolicyChunk
 from validate_result import ValidationResult
 from decision_status import DecisionStatus
-from retriever import retrieve_resolved_chunks, retrieve_and_validate
+from retriever_model import RetrievalContext
+from retriever import (
+    retrieve_validate_policies, aretrieve_validate_policies,
+    build_retrieval_context, abuild_retrieval_context
+)
 from vector_store import get_vector_store
+from config import settings
+from timing import span
+import asyncio
 import json
 
 # Extract Clause
@@ -58,7 +65,9 @@ def is_clause_applicable_for_role(
 def clause_vector_search(
         query: str,
         policy_ids: set[str],
-        top_k: int = 10
+        top_k: int = 10,
+        query_embedding: list[float] | None = None,
+        role: str | None = None
 ) -> list[PolicyClause]:
     """
     Search for relevant clauses within approved policies.
@@ -67,35 +76,81 @@ def clause_vector_search(
         query: Search query
         policy_ids: Set of approved policy IDs to search within
         top_k: Number of top results to return
+        query_embedding: Precomputed query embedding (optional)
+        role: Role the clauses must apply to (filtered in the store)
 
     Returns:
         List of PolicyClause objects
     """
     vector_store = get_vector_store()
-    clauses = vector_store.query_clauses(
-        query=query,
-        policy_ids=policy_ids,
-        top_k=top_k
-    )
+    with span("clause_search"):
+        clauses = vector_store.query_clauses(
+            query=query,
+            policy_ids=policy_ids,
+            top_k=top_k,
+            query_embedding=query_embedding,
+            role=role
+        )
     return clauses
 
 
+async def aclause_vector_search(
+        query: str,
+        policy_ids: set[str],
+        top_k: int = 10,
+        query_embedding: list[float] | None = None,
+        role: str | None = None
+) -> list[PolicyClause]:
+    """Async variant of clause_vector_search"""
+    vector_store = get_vector_store()
+    with span("clause_search"):
+        return await vector_store.aquery_clauses(
+            query=query,
+            policy_ids=policy_ids,
+            top_k=top_k,
+            query_embedding=query_embedding,
+            role=role
+        )
+
+
 # Retrieve clause
 def retrieve_relevant_clauses(
         query: str,
         approved_policies: list[PolicyChunk],
-        top_k: int = 10
+        top_k: int = 10,
+        query_embedding: list[float] | None = None,
+        role: str | None = None
 ) -> list[PolicyClause]:
     policy_ids = {p.metadata.policy_id for p in approved_policies}
 
     candidate_clauses = clause_vector_search(
         query=query,
         policy_ids=policy_ids,
-        top_k=top_k
+        top_k=top_k,
+        query_embedding=query_embedding,
+        role=role
     )
 
     return candidate_clauses
 
+
+async def aretrieve_relevant_clauses(
+        query: str,
+        approved_policies: list[PolicyChunk],
+        top_k: int = 10,
+        query_embedding: list[float] | None = None,
+        role: str | None = None
+) -> list[PolicyClause]:
+    policy_ids = {p.metadata.policy_id for p in approved_policies}
+
+    return await aclause_vector_search(
+        query=query,
+        policy_ids=policy_ids,
+        top_k=top_k,
+        query_embedding=query_embedding,
+        role=role
+    )
+
 # Clause coverage
 def validate_clause_coverage(clauses: list[PolicyClause]) -> ValidationResult | None:
     if not clauses:
@@ -109,41 +164,153 @@ def validate_clause_coverage(clauses: list[PolicyClause]) -> ValidationResult |
 
 # Clause confict
 def detect_clause_conflict(clauses: list[PolicyClause]) -> ValidationResult | None:
-    types = set(c.clause_type for c in clauses)
+    """
+    Detect conflicting clauses in the approved set.
 
-    if 'allow' in types and 'deny' in types:
-        return ValidationResult(
-            status=DecisionStatus.CONFLICT,
-            reason='Conflicting allow/deny clauses detected',
-            supporting_policy_ids=list(
-                {c.policy_id for c in clauses}
-            )
-        )
-    
-    return None
+    Clauses upserted through this process are checked against the
+    precomputed conflict index. If any clause is unknown to it (ingested
+    elsewhere), any allow + deny pair counts as a conflict.
+    """
+    index = get_vector_store().clause_conflicts
+
+    if all(index.knows(c.clause_id) for c in clauses):
+        conflicting = index.conflicting([c.clause_id for c in clauses])
+        if not conflicting:
+            return None
+        policy_ids = {c.policy_id for c in clauses if c.clause_id in conflicting}
+    else:
+        types = set(c.clause_type for c in clauses)
+        if not ('allow' in types and 'deny' in types):
+            return None
+        policy_ids = {c.policy_id for c in clauses}
+
+    return ValidationResult(
+        status=DecisionStatus.CONFLICT,
+        reason='Conflicting allow/deny clauses detected',
+        supporting_policy_ids=list(policy_ids)
+    )
 
 # Clause retriever
-def retrieve_validate_clauses(request):
-    validation = retrieve_and_validate(request)
+def retrieve_validate_clauses(request, context: RetrievalContext | None = None):
+    # Embed the query once for every retrieval stage
+    context = context or build_retrieval_context(request)
+
+    # Resolved chunks from validation are reused for clause retrieval
+    validation, policies = retrieve_validate_policies(request, context)
     if validation.status != DecisionStatus.SAFE:
         return validation, []
-    
-    policies = retrieve_resolved_chunks(request)
 
     # Clause retrieval
     clauses = retrieve_relevant_clauses(
         query=request.query,
-        approved_policies=policies
+        approved_policies=policies,
+        query_embedding=context.query_embedding,
+        role=request.role
     )
 
-    # Filter role
-    clauses = [
-        c for c in clauses
-        if is_clause_applicable_for_role(c, request.role)
-    ]
+    with span("clause_validation"):
+        return validate_clauses(validation, clauses, request.role)
+
+
+async def aretrieve_validate_clauses(
+        request,
+        context: RetrievalContext | None = None,
+        policy_result: tuple[ValidationResult, list[PolicyChunk]] | None = None
+):
+    """
+    Async variant of retrieve_validate_clauses.
+
+    policy_result is an already computed (validation, resolved policies)
+    pair, e.g. from a shared batch policy query; policy retrieval is then
+    skipped.
+    """
+    context = context or await abuild_retrieval_context(request)
+
+    if policy_result is None and settings.speculative_clause_search:
+        return await aretrieve_validate_clauses_speculative(request, context)
+
+    validation, policies = policy_result or await aretrieve_validate_policies(request, context)
+    if validation.status != DecisionStatus.SAFE:
+        return validation, []
+
+    clauses = await aretrieve_relevant_clauses(
+        query=request.query,
+        approved_policies=policies,
+        query_embedding=context.query_embedding,
+        role=request.role
+    )
+
+    with span("clause_validation"):
+        return validate_clauses(validation, clauses, request.role)
+
+
+async def aretrieve_validate_clauses_speculative(request, context, top_k: int = 10):
+    """
+    Run the clause query concurrently with policy retrieval.
+
+    The clause query is issued without the policy filter and over-fetches
+    settings.speculative_clause_top_k results. Once authority resolution
+    finishes, the results are intersected with the resolved policy IDs.
+    Filtering preserves score order, so the surviving clauses are exactly
+    what the sequential filtered query would return when at least top_k
+    survive, the window reached the end of the namespace, or every clause
+    of the resolved policies is already in the window. Otherwise fall back
+    to the filtered query.
+
+    The last check needs clause counts from ingest in this process, and an
+    unfiltered window rarely holds a few policies' clauses in a large
+    namespace, so the mode is off by default (SPECULATIVE_CLAUSE_SEARCH).
+    """
+    speculative_k = max(settings.speculative_clause_top_k, top_k)
+    clause_task = asyncio.create_task(aclause_vector_search(
+        query=request.query,
+        policy_ids=None,
+        top_k=speculative_k,
+        query_embedding=context.query_embedding,
+        role=request.role
+    ))
+
+    try:
+        validation, policies = await aretrieve_validate_policies(request, context)
+    except BaseException:
+        clause_task.cancel()
+        raise
+
+    if validation.status != DecisionStatus.SAFE:
+        clause_task.cancel()
+        return validation, []
+
+    speculative = await clause_task
+    policy_ids = {p.metadata.policy_id for p in policies}
+    clauses = [c for c in speculative if c.policy_id in policy_ids][:top_k]
+
+    complete = (
+        len(clauses) >= top_k
+        or len(speculative) < speculative_k
+        or get_vector_store().known_clause_count(policy_ids, request.role) == len(clauses)
+    )
+    if not complete:
+        clauses = await aretrieve_relevant_clauses(
+            query=request.query,
+            approved_policies=policies,
+            top_k=top_k,
+            query_embedding=context.query_embedding,
+            role=request.role
+        )
+
+    with span("clause_validation"):
+        return validate_clauses(validation, clauses, request.role)
+
+# Clause validation
+def validate_clauses(
+        validation: ValidationResult,
+        clauses: list[PolicyClause],
+        role: str
+) -> tuple[ValidationResult, list[PolicyClause]]:
+    # Role applicability is already enforced by the clause query filter
 
     # Apply overrides first
-    clauses = apply_overrides(clauses)
+    clauses = apply_overrides(clauses, set(validation.supporting_policy_ids), role)
 
     # Clause conflict detection
     conflict = detect_clause_conflict(clauses)
@@ -159,8 +326,19 @@ def retrieve_validate_clauses(request):
 
 # Overrides
 def apply_overrides(
-        clauses: list[PolicyClause]
+        clauses: list[PolicyClause],
+        policy_ids: set[str],
+        role: str
 ) -> list[PolicyClause]:
+    """
+    Drop clauses superseded by an applicable override.
+
+    Clauses upserted through this process are resolved against the
+    precompiled override graph, so overriders outside the retrieved set
+    and override chains count. Direct overrides within the retrieved set
+    still apply, which covers clauses ingested by another process.
+    """
+    graph = get_vector_store().override_graph
     overridden_ids = set()
 
     for clause in clauses:
@@ -169,6 +347,7 @@ def apply_overrides(
     return [
         c for c in clauses
         if c.clause_id not in overridden_ids
+        and not graph.is_overridden(c.clause_id, policy_ids, role)
     ]
 
 # Prompt
@@ -5,13 +5,53 @@ import os
 load_dotenv()
 
 class Settings(BaseSettings):
-    database_url: str = os.getenv('DATABASE_URL')
-    secret_key: str = os.getenv('SECRET_KEY')
-    ip_address: str = os.getenv('IP_ADDRESS')
-    pinecone_key: str = os.getenv('PINECONE')
-    openai_key: str = os.getenv('OPENAI')
-    index_name: str = os.getenv('INDEX_NAME')
-    pinecone_index_name: str = os.getenv('PINECONE_INDEX_NAME')
-    claude_key: str = os.getenv('CLAUDE')
+    database_url: str | None = os.getenv('DATABASE_URL')
+    secret_key: str | None = os.getenv('SECRET_KEY')
+    ip_address: str | None = os.getenv('IP_ADDRESS')
+    pinecone_key: str | None = os.getenv('PINECONE')
+    openai_key: str | None = os.getenv('OPENAI')
+    index_name: str | None = os.getenv('INDEX_NAME')
+    pinecone_index_name: str | None = os.getenv('PINECONE_INDEX_NAME')
+    claude_key: str | None = os.getenv('CLAUDE')
+    vector_backend: str = os.getenv('VECTOR_BACKEND', 'pinecone')
+    local_vector_index: str = os.getenv('LOCAL_VECTOR_INDEX', 'exact')
+    local_vector_store_path: str = os.getenv('LOCAL_VECTOR_STORE_PATH', '')
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 100
+    hnsw_ef_search: int = 64
+    hnsw_exact_max_rows: int = 20_000
+    hnsw_max_tombstone_fraction: float = 0.2
+    embedding_provider: str = os.getenv('EMBEDDING_PROVIDER', 'openai')
+    local_embedding_dimension: int = 384
+    llm_provider: str = os.getenv('LLM_PROVIDER', 'openai')
+    llm_model: str | None = os.getenv('LLM_MODEL')
+    local_llm_latency_ms: float = 0.0
+    local_llm_token_latency_ms: float = 0.0
+    speculative_clause_search: bool = False
+    speculative_clause_top_k: int = 50
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = os.getenv('EMBEDDING_CACHE_PATH', 'embedding_cache.db')
+    embedding_cache_memory_items: int = 10_000
+    embedding_cache_disk_items: int = 1_000_000
+    embedding_batch_window_ms: float = 5.0
+    embedding_batch_max_size: int = 256
+    audit_backend: str = os.getenv('AUDIT_BACKEND', 'sqlite')
+    audit_db_path: str = os.getenv('AUDIT_DB_PATH', 'audit.db')
+    audit_flush_interval_ms: float = 50.0
+    audit_queue_size: int = 10_000
+    audit_batch_size: int = 500
+    audit_strict_durability: bool = False
+    audit_memory_max_records: int = 100_000
+    metrics_enabled: bool = False
+    decision_cache_enabled: bool = True
+    decision_cache_max_items: int = 10_000
+    decision_cache_ttl_seconds: float = 3600.0
+    answer_cache_enabled: bool = True
+    answer_cache_similarity_threshold: float = 0.92
+    answer_cache_max_buckets: int = 10_000
+    answer_cache_bucket_size: int = 32
+    answer_batch_max_size: int = 1000
+    answer_batch_retrieval_concurrency: int = 32
+    answer_batch_llm_concurrency: int = 8
 
 settings = Settings()
\ No newline at end of file
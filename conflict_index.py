@@ -0,0 +1,126 @@
+# Clause Conflict Index - conflicting clause pairs compiled at ingest time
+import threading
+from typing import Optional
+from override_graph import OverrideGraph
+from policy_data_model import PolicyClause
+
+
+_NO_CONFLICTS: frozenset[str] = frozenset()
+
+
+class ClauseConflictIndex:
+    """
+    Conflicting clause pairs, keyed by clause ID.
+
+    Two clauses conflict when they belong to the same policy, one allows
+    what the other denies, their roles overlap, and neither overrides the
+    other directly or transitively. Each clause maps to the set of clauses
+    it conflicts with, so a request only looks up its retrieved IDs.
+    """
+
+    def __init__(self, override_graph: OverrideGraph):
+        """
+        Initialize conflict index.
+
+        Args:
+            override_graph: Override graph of the same clauses
+        """
+        self.override_graph = override_graph
+        self.conflicts: dict[str, frozenset[str]] = {}
+
+        # clause_id -> (clause_type, roles or None for all), per policy
+        self._policy_clauses: dict[str, dict[str, tuple[str, Optional[frozenset[str]]]]] = {}
+        self._policy_of: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add_clauses(self, clauses: list[PolicyClause], overrides_changed: set[str] = frozenset()):
+        """
+        Add or replace clauses and recompute the affected policies.
+
+        Args:
+            clauses: Upserted clauses (already added to the override graph)
+            overrides_changed: Clause IDs whose overriders changed in the graph
+        """
+        with self._lock:
+            policies = set()
+            for clause in clauses:
+                previous = self._policy_of.get(clause.clause_id)
+                if previous is not None and previous != clause.policy_id:
+                    del self._policy_clauses[previous][clause.clause_id]
+                    policies.add(previous)
+
+                self._policy_of[clause.clause_id] = clause.policy_id
+                self._policy_clauses.setdefault(clause.policy_id, {})[clause.clause_id] = (
+                    clause.clause_type,
+                    None if clause.applies_to_roles is None else frozenset(clause.applies_to_roles)
+                )
+                policies.add(clause.policy_id)
+
+            policies.update(
+                self._policy_of[cid] for cid in overrides_changed if cid in self._policy_of
+            )
+            for policy_id in policies:
+                self._rebuild(policy_id)
+
+    def remove_clauses(self, clause_ids: list[str], overrides_changed: set[str] = frozenset()):
+        """
+        Remove clauses and recompute the affected policies.
+
+        Args:
+            clause_ids: Deleted clause IDs (already removed from the override graph)
+            overrides_changed: Clause IDs whose overriders changed in the graph
+        """
+        with self._lock:
+            policies = set()
+            for clause_id in clause_ids:
+                policy_id = self._policy_of.pop(clause_id, None)
+                if policy_id is not None:
+                    del self._policy_clauses[policy_id][clause_id]
+                    self.conflicts.pop(clause_id, None)
+                    policies.add(policy_id)
+
+            policies.update(
+                self._policy_of[cid] for cid in overrides_changed if cid in self._policy_of
+            )
+            for policy_id in policies:
+                self._rebuild(policy_id)
+
+    def _rebuild(self, policy_id: str):
+        """Recompute conflict pairs among one policy's clauses"""
+        members = self._policy_clauses.get(policy_id, {})
+        allows = [(cid, roles) for cid, (kind, roles) in members.items() if kind == "allow"]
+        denies = [(cid, roles) for cid, (kind, roles) in members.items() if kind == "deny"]
+
+        pairs: dict[str, set[str]] = {}
+        for a, a_roles in allows:
+            for d, d_roles in denies:
+                overlap = a_roles is None or d_roles is None or not a_roles.isdisjoint(d_roles)
+                if overlap and not self.override_graph.related(a, d):
+                    pairs.setdefault(a, set()).add(d)
+                    pairs.setdefault(d, set()).add(a)
+
+        for cid in members:
+            if cid in pairs:
+                self.conflicts[cid] = frozenset(pairs[cid])
+            else:
+                self.conflicts.pop(cid, None)
+
+    def knows(self, clause_id: str) -> bool:
+        """Whether the clause was upserted through this store"""
+        return clause_id in self._policy_of
+
+    def conflicting(self, clause_ids: list[str]) -> set[str]:
+        """
+        Clauses that conflict with another clause of the same set.
+
+        Args:
+            clause_ids: Retrieved clause IDs
+
+        Returns:
+            Subset of clause_ids involved in at least one conflict
+        """
+        present = set(clause_ids)
+        return {
+            cid for cid in present
+            if not self.conflicts.get(cid, _NO_CONFLICTS).isdisjoint(present)
+        }
@@ -0,0 +1,129 @@
+# Decision Cache - reuse decisions for repeated retrieval requests
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from pydantic import BaseModel
+from config import settings
+from decision_status import DecisionStatus
+from retriever_model import RetrievalRequest
+from validate_result import ValidationResult
+
+
+class CachedDecision(BaseModel):
+    """Outcome of the retrieval + generation pipeline for one request"""
+    audit_id: str   # audit record the decision was computed for
+    validation: ValidationResult
+    decision_status: DecisionStatus
+    decision_reason: str
+    policy_ids: list[str]
+    clause_ids: list[str]
+    answer: str | None
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so trivially different spellings share a key"""
+    return " ".join(query.split())
+
+
+def request_key(request: RetrievalRequest) -> tuple:
+    """Normalized (query, jurisdiction, as_of_date, role) key"""
+    return (
+        normalize_query(request.query),
+        request.jurisdiction,
+        request.as_of_date.isoformat(),
+        request.role
+    )
+
+
+class DecisionCache:
+    """
+    LRU + TTL cache of decisions keyed by normalized request and corpus version.
+
+    Including the vector store's corpus version in the key means any upsert
+    makes earlier entries unreachable; they age out through LRU/TTL.
+    """
+
+    def __init__(self, max_items: int = 10_000, ttl_seconds: float = 3600.0):
+        """
+        Initialize decision cache.
+
+        Args:
+            max_items: Maximum cached decisions
+            ttl_seconds: Lifetime of a cached decision
+        """
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[float, CachedDecision]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, request: RetrievalRequest, corpus_version: int) -> Optional[CachedDecision]:
+        """
+        Look up a live decision for the request.
+
+        Args:
+            request: Retrieval request
+            corpus_version: Current vector store corpus version
+
+        Returns:
+            CachedDecision, or None on a miss or expired entry
+        """
+        key = request_key(request) + (corpus_version,)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, request: RetrievalRequest, corpus_version: int, decision: CachedDecision):
+        """
+        Cache a decision.
+
+        Args:
+            request: Retrieval request the decision answers
+            corpus_version: Corpus version the decision was computed against
+            decision: Decision to cache
+        """
+        key = request_key(request) + (corpus_version,)
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, decision)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and size"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "items": len(self._entries)
+            }
+
+
+def create_decision_cache() -> Optional[DecisionCache]:
+    """
+    Build the decision cache from config.
+
+    Returns:
+        DecisionCache, or None if disabled
+    """
+    if not settings.decision_cache_enabled:
+        return None
+
+    return DecisionCache(
+        max_items=settings.decision_cache_max_items,
+        ttl_seconds=settings.decision_cache_ttl_seconds
+    )
@@ -0,0 +1,152 @@
+# Embedding Providers - OpenAI API and a deterministic local hashing embedder
+import asyncio
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from typing import Optional
+import numpy as np
+from openai import OpenAI, AsyncOpenAI
+from config import settings
+
+
+class Embedder(ABC):
+    """
+    Abstract embedding provider.
+
+    Subclasses set model (used as the embedding cache namespace) and
+    dimension, and implement batch embedding.
+    """
+
+    model: str
+    dimension: int
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding vectors aligned with texts
+        """
+        pass
+
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        """
+        Async variant of embed.
+
+        Defaults to running embed in a worker thread; providers with a
+        native async client override this.
+        """
+        return await asyncio.to_thread(self.embed, texts)
+
+    async def aclose(self):
+        """Release async client resources"""
+        pass
+
+
+class OpenAIEmbedder(Embedder):
+    """OpenAI embeddings API (text-embedding-3-small by default)"""
+
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        api_key: Optional[str] = None
+    ):
+        """
+        Initialize OpenAI embedding clients.
+
+        Args:
+            model: OpenAI embedding model to use
+            api_key: OpenAI API key (defaults to config)
+        """
+        self.model = model
+        self.dimension = 1536  # text-embedding-3-small dimension
+        self.client = OpenAI(api_key=api_key or settings.openai_key)
+        self.async_client = AsyncOpenAI(api_key=api_key or settings.openai_key)
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        response = self.client.embeddings.create(model=self.model, input=texts)
+        return [item.embedding for item in response.data]
+
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        response = await self.async_client.embeddings.create(model=self.model, input=texts)
+        return [item.embedding for item in response.data]
+
+    async def aclose(self):
+        await self.async_client.close()
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic offline embedder using signed feature hashing.
+
+    Lowercased word unigrams and bigrams are hashed (blake2b, so results
+    are stable across processes) into a fixed number of signed buckets and
+    the result is L2-normalized. Texts sharing vocabulary get high cosine
+    similarity, which is enough to exercise retrieval without a network.
+    """
+
+    _TOKEN = re.compile(r"\w+")
+
+    def __init__(self, dimension: int = 384):
+        """
+        Initialize hashing embedder.
+
+        Args:
+            dimension: Output vector dimension
+        """
+        self.model = f"local-hashing-{dimension}"
+        self.dimension = dimension
+
+    def _features(self, text: str) -> list[str]:
+        tokens = self._TOKEN.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def _embed_one(self, text: str) -> list[float]:
+        features = self._features(text)
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        if not features:
+            return vector.tolist()
+
+        digests = [
+            int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little")
+            for f in features
+        ]
+        hashes = np.array(digests, dtype=np.uint64)
+        buckets = (hashes % np.uint64(self.dimension)).astype(np.intp)
+        signs = np.where((hashes >> np.uint64(63)) == 1, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, buckets, signs)
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed_one(text) for text in texts]
+
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        # CPU-only and fast; a thread hop would cost more than the work
+        return self.embed(texts)
+
+
+def create_embedder(provider: Optional[str] = None) -> Embedder:
+    """
+    Factory function to build the configured embedding provider.
+
+    Args:
+        provider: Provider name ("openai" or "local"), defaults to config
+
+    Returns:
+        Configured Embedder
+    """
+    provider = (provider or settings.embedding_provider).lower()
+    if provider == "openai":
+        return OpenAIEmbedder()
+    elif provider == "local":
+        return HashingEmbedder(dimension=settings.local_embedding_dimension)
+    else:
+        raise ValueError(f"Unsupported embedding provider: {provider}")
@@ -0,0 +1,110 @@
+# Embedding Micro-Batcher - coalesce concurrent single-text embedding calls
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+
+class EmbeddingBatcher:
+    """
+    Collects concurrent embed requests into one batch call.
+
+    When no batch call is in flight, a text is sent on the next loop
+    iteration together with whatever arrived in the same iteration, so a
+    lone request never waits out the window. While a call is in flight,
+    texts accumulate and are sent when max_batch_size texts are pending,
+    window_ms has passed since the first of them, or the in-flight call
+    returns, whichever comes first. Each caller awaits its own future and
+    receives its vector from the shared response.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[list[str]], Awaitable[list[list[float]]]],
+        window_ms: float = 5.0,
+        max_batch_size: int = 256
+    ):
+        """
+        Initialize batcher.
+
+        Args:
+            embed_batch: Async function embedding a list of texts
+            window_ms: Maximum time to wait for more texts before sending
+            max_batch_size: Maximum texts per batch call (API limit is 2048)
+        """
+        self._embed_batch = embed_batch
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Handle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: set[asyncio.Task] = set()
+
+        self.batches_sent = 0
+        self.texts_sent = 0
+
+    async def embed(self, text: str) -> list[float]:
+        """
+        Embed one text as part of the next batch.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Pending state belongs to a previous event loop
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            if self._in_flight:
+                self._timer = loop.call_later(self.window, self._flush)
+            else:
+                # Idle: nothing to batch with beyond this iteration's arrivals
+                self._timer = loop.call_soon(self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = self._loop.create_task(self._send(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._sent)
+
+    def _sent(self, task: asyncio.Task):
+        self._in_flight.discard(task)
+        # Texts that queued behind this call have waited long enough
+        if self._pending and not self._in_flight:
+            self._flush()
+
+    async def _send(self, batch: list[tuple[str, asyncio.Future]]):
+        self.batches_sent += 1
+        self.texts_sent += len(batch)
+
+        try:
+            embeddings = await self._embed_batch([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            # Callers may have been cancelled while waiting
+            if not future.done():
+                future.set_result(embedding)
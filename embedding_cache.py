@@ -0,0 +1,260 @@
+# Embedding Cache - content-addressed by (embedding model, sha256(text))
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional
+import numpy as np
+from config import settings
+
+
+# Text hashes per disk lookup query (SQLite caps bound parameters at 999 on older builds)
+DISK_LOOKUP_CHUNK = 900
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache.
+
+    - Memory tier: LRU of float32 vectors bounded by max_memory_items
+    - Disk tier: SQLite table of float32 blobs bounded by max_disk_items,
+      evicting oldest entries first (optional, skipped when path is None)
+
+    Disk hits are promoted to the memory tier. Only successful embeddings
+    should be stored; callers must not cache fallback vectors. The async
+    methods run the disk tier in a worker thread so SQLite I/O never
+    blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_items: int = 10_000,
+        max_disk_items: int = 1_000_000
+    ):
+        """
+        Initialize embedding cache.
+
+        Args:
+            path: SQLite file for the disk tier (memory-only if None)
+            max_memory_items: Maximum vectors held in memory
+            max_disk_items: Maximum vectors held on disk
+        """
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self._memory: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()      # memory tier and counters
+        self._db_lock = threading.Lock()   # SQLite connection
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_items = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # WAL with NORMAL skips the fsync per commit; a crash can only lose recent cache rows
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+            """)
+            self._db.commit()
+            self._disk_items = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, text: str) -> Optional[list[float]]:
+        """Cached embedding for text, or None on a miss"""
+        return self.get_many(model, [text])[0]
+
+    async def aget(self, model: str, text: str) -> Optional[list[float]]:
+        """Async variant of get"""
+        return (await self.aget_many(model, [text]))[0]
+
+    def get_many(self, model: str, texts: list[str]) -> list[Optional[list[float]]]:
+        """
+        Look up embeddings for several texts.
+
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+
+        Returns:
+            Embeddings aligned with texts, None where missing
+        """
+        keys = [(model, self.text_hash(text)) for text in texts]
+        results, disk_lookups = self._memory_get(keys)
+        if disk_lookups:
+            self._disk_get(keys, disk_lookups, results)
+        return self._finish_get(results)
+
+    async def aget_many(self, model: str, texts: list[str]) -> list[Optional[list[float]]]:
+        """Async variant of get_many; the disk tier runs in a worker thread"""
+        keys = [(model, self.text_hash(text)) for text in texts]
+        results, disk_lookups = self._memory_get(keys)
+        if disk_lookups:
+            await asyncio.to_thread(self._disk_get, keys, disk_lookups, results)
+        return self._finish_get(results)
+
+    def _memory_get(self, keys: list[tuple[str, str]]) -> tuple[list[Optional[np.ndarray]], list[int]]:
+        """Memory tier hits, plus the indexes to look up on disk"""
+        results: list[Optional[np.ndarray]] = [None] * len(keys)
+        disk_lookups = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    results[i] = vector
+                elif self._db is not None:
+                    disk_lookups.append(i)
+        return results, disk_lookups
+
+    def _disk_get(
+        self,
+        keys: list[tuple[str, str]],
+        indexes: list[int],
+        results: list[Optional[np.ndarray]]
+    ):
+        """Fill results at indexes from the disk tier, one IN query per chunk of keys"""
+        wanted: dict[tuple[str, str], list[int]] = {}
+        for i in indexes:
+            wanted.setdefault(keys[i], []).append(i)
+
+        by_model: dict[str, list[str]] = {}
+        for model, text_hash in wanted:
+            by_model.setdefault(model, []).append(text_hash)
+
+        found = []
+        with self._db_lock:
+            for model, hashes in by_model.items():
+                for start in range(0, len(hashes), DISK_LOOKUP_CHUNK):
+                    chunk = hashes[start:start + DISK_LOOKUP_CHUNK]
+                    rows = self._db.execute(
+                        "SELECT text_hash, vector FROM embeddings "
+                        f"WHERE model = ? AND text_hash IN ({', '.join('?' * len(chunk))})",
+                        [model, *chunk]
+                    ).fetchall()
+                    found.extend(((model, text_hash), vector) for text_hash, vector in rows)
+
+        with self._lock:
+            for key, blob in found:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                self._remember(key, vector)
+                for i in wanted[key]:
+                    results[i] = vector
+                    self.disk_hits += 1
+
+    def _finish_get(self, results: list[Optional[np.ndarray]]) -> list[Optional[list[float]]]:
+        found = sum(r is not None for r in results)
+        with self._lock:
+            self.hits += found
+            self.misses += len(results) - found
+        return [r.tolist() if r is not None else None for r in results]
+
+    def put(self, model: str, text: str, embedding: list[float]):
+        """Store one embedding"""
+        self.put_many(model, [text], [embedding])
+
+    def put_many(self, model: str, texts: list[str], embeddings: list[list[float]]):
+        """
+        Store embeddings in both tiers.
+
+        Args:
+            model: Embedding model name
+            texts: Texts that were embedded
+            embeddings: Embeddings aligned with texts
+        """
+        rows = self._memory_put(model, texts, embeddings)
+        if self._db is not None and rows:
+            self._disk_put(rows)
+
+    async def aput_many(self, model: str, texts: list[str], embeddings: list[list[float]]):
+        """Async variant of put_many; the disk tier runs in a worker thread"""
+        rows = self._memory_put(model, texts, embeddings)
+        if self._db is not None and rows:
+            await asyncio.to_thread(self._disk_put, rows)
+
+    def _memory_put(
+        self,
+        model: str,
+        texts: list[str],
+        embeddings: list[list[float]]
+    ) -> list[tuple[str, str, bytes]]:
+        """Store in the memory tier and return the rows for the disk tier"""
+        rows = []
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                key = (model, self.text_hash(text))
+                vector = np.asarray(embedding, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key[0], key[1], vector.tobytes()))
+        return rows
+
+    def _disk_put(self, rows: list[tuple[str, str, bytes]]):
+        with self._db_lock:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                rows
+            )
+            self._disk_items += self._db.total_changes - before
+
+            # Evict oldest rows once over the disk bound
+            overflow = self._disk_items - self.max_disk_items
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM embeddings WHERE rowid IN "
+                    "(SELECT rowid FROM embeddings ORDER BY rowid LIMIT ?)",
+                    (overflow,)
+                )
+                self._disk_items -= overflow
+            self._db.commit()
+
+    def _remember(self, key: tuple[str, str], vector: np.ndarray):
+        """Insert into the memory LRU, evicting least recently used entries"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "memory_items": len(self._memory),
+                "disk_items": self._disk_items
+            }
+
+
+def create_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Build the embedding cache from config.
+
+    Returns:
+        EmbeddingCache, or None if caching is disabled
+    """
+    if not settings.embedding_cache_enabled:
+        return None
+
+    return EmbeddingCache(
+        path=settings.embedding_cache_path or None,
+        max_memory_items=settings.embedding_cache_memory_items,
+        max_disk_items=settings.embedding_cache_disk_items
+    )
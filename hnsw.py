@@ -0,0 +1,390 @@
+# HNSW Index - approximate nearest neighbour graph for the local vector store
+import heapq
+import math
+import random
+from typing import Optional
+import numpy as np
+
+
+_NO_LINKS = np.empty(0, dtype=np.int32)
+
+
+class HNSWIndex:
+    """
+    Hierarchical Navigable Small World graph over unit vectors (inner product).
+
+    Vectors are inserted incrementally. Each node draws a random top layer
+    and is linked on every layer down to 0 to neighbours picked with the
+    diversity heuristic of Malkov & Yashunin (at most m per upper layer,
+    2 * m on layer 0). A query descends greedily through the upper layers,
+    then runs a best-first beam of width ef_search on layer 0. Similarities
+    are batched NumPy dot products over each expanded node's neighbour list.
+
+    Callers address vectors by integer label (the local store's row).
+    Re-adding or deleting a label tombstones its node: the node keeps its
+    links for navigation but is never returned. Once tombstones pile up,
+    rebuilt() returns a compacted copy.
+
+    Link lists are replaced, never modified in place, so copy() gives an
+    index that can take inserts while the original keeps serving searches.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        m: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 64,
+        seed: int = 0
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            dimension: Vector dimension
+            m: Links per node on upper layers (2 * m on layer 0)
+            ef_construction: Beam width when linking inserted nodes
+            ef_search: Default beam width for queries
+            seed: Seed for layer assignment
+        """
+        self.dimension = dimension
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._level_mult = 1 / math.log(max(m, 2))
+        self._rng = random.Random(seed)
+
+        self._vectors = np.zeros((0, dimension), dtype=np.float32)
+        self._labels = np.zeros(0, dtype=np.int64)
+        self._deleted = np.zeros(0, dtype=bool)
+        self.links: list[list[np.ndarray]] = []   # node -> neighbours per layer
+        self.node_of: dict[int, int] = {}          # live label -> node
+
+        self.entry_point: Optional[int] = None
+        self.max_level = -1
+
+    @property
+    def size(self) -> int:
+        """Nodes in the graph, including tombstones"""
+        return len(self.links)
+
+    def __len__(self) -> int:
+        return len(self.node_of)
+
+    @property
+    def tombstones(self) -> int:
+        """Deleted or replaced nodes still in the graph"""
+        return self.size - len(self.node_of)
+
+    def copy(self) -> "HNSWIndex":
+        """
+        Copy to modify while this index is still being searched.
+
+        Vector and label rows past this index's size are only ever written
+        by the copy, so the backing vector array is shared.
+        """
+        index = HNSWIndex(self.dimension, self.m, self.ef_construction, self.ef_search)
+        index._level_mult = self._level_mult
+        index._rng.setstate(self._rng.getstate())
+        index._vectors = self._vectors
+        index._labels = self._labels.copy()
+        index._deleted = self._deleted.copy()
+        index.links = list(self.links)
+        index.node_of = dict(self.node_of)
+        index.entry_point = self.entry_point
+        index.max_level = self.max_level
+        return index
+
+    def rebuilt(self) -> "HNSWIndex":
+        """New index holding only the live vectors, inserted in their original order"""
+        index = HNSWIndex(self.dimension, self.m, self.ef_construction, self.ef_search)
+        for node in sorted(self.node_of.values()):
+            index.add(int(self._labels[node]), self._vectors[node])
+        return index
+
+    def _reserve(self, nodes: int):
+        capacity = self._vectors.shape[0]
+        if nodes <= capacity:
+            return
+        capacity = max(nodes, capacity * 2, 64)
+        for name in ("_vectors", "_labels", "_deleted"):
+            old = getattr(self, name)
+            grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            grown[:self.size] = old[:self.size]
+            setattr(self, name, grown)
+
+    def add(self, label: int, vector):
+        """
+        Insert a vector, replacing (tombstoning) any earlier one with the label.
+
+        Args:
+            label: Caller's identifier for the vector
+            vector: Vector of length dimension (normalized here)
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+
+        self.delete(label)
+        node = self.size
+        self._reserve(node + 1)
+        self._vectors[node] = vector
+        self._labels[node] = label
+        self.node_of[label] = node
+
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        self.links.append([_NO_LINKS] * (level + 1))
+
+        if self.entry_point is None:
+            self.entry_point, self.max_level = node, level
+            return
+
+        entry = [self.entry_point]
+        for layer in range(self.max_level, level, -1):
+            entry = [self._search_layer(vector, entry, 1, layer)[0][1]]
+
+        for layer in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(vector, entry, self.ef_construction, layer)
+            neighbours = self._select_neighbours(found, self.m)
+            self.links[node][layer] = np.array(neighbours, dtype=np.int32)
+
+            max_links = 2 * self.m if layer == 0 else self.m
+            for neighbour in neighbours:
+                links = np.append(self.links[neighbour][layer], np.int32(node))
+                if len(links) > max_links:
+                    sims = self._vectors[links] @ self._vectors[neighbour]
+                    order = np.argsort(-sims, kind="stable")
+                    links = np.array(
+                        self._select_neighbours(
+                            list(zip(sims[order].tolist(), links[order].tolist())),
+                            max_links
+                        ),
+                        dtype=np.int32
+                    )
+                # Replace the neighbour's layer list so copies sharing it are unaffected
+                neighbour_links = list(self.links[neighbour])
+                neighbour_links[layer] = links
+                self.links[neighbour] = neighbour_links
+
+            entry = [n for _, n in found]
+
+        if level > self.max_level:
+            self.entry_point, self.max_level = node, level
+
+    def delete(self, label: int) -> bool:
+        """
+        Tombstone the vector with this label.
+
+        Returns:
+            True if the label was present
+        """
+        node = self.node_of.pop(label, None)
+        if node is None:
+            return False
+        self._deleted[node] = True
+        return True
+
+    def relabel(self, label: int, new_label: int):
+        """
+        Move a vector to another label without re-inserting it.
+
+        Any vector already holding new_label is tombstoned.
+        """
+        node = self.node_of.pop(label, None)
+        if node is None:
+            return
+        self.delete(new_label)
+        self.node_of[new_label] = node
+        self._labels[node] = new_label
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entry: list[int],
+        ef: int,
+        layer: int,
+        valid: Optional[np.ndarray] = None
+    ) -> list[tuple[float, int]]:
+        """
+        Best-first beam search on one layer.
+
+        Only nodes allowed by valid (all if None) enter the results, but
+        every reached node is expanded so the beam can pass through them.
+
+        Returns:
+            Up to ef (similarity, node) pairs, most similar first
+        """
+        visited = set(entry)
+        sims = (self._vectors[entry] @ query).tolist()
+        candidates = [(-s, n) for s, n in zip(sims, entry)]
+        heapq.heapify(candidates)
+        results = [(s, n) for s, n in zip(sims, entry) if valid is None or valid[n]]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            if len(results) >= ef and -neg_sim < results[0][0]:
+                break
+
+            neighbours = [n for n in self.links[node][layer].tolist() if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+
+            sims = self._vectors[neighbours] @ query
+            if len(results) >= ef:
+                # Prefilter against the current bound; it only rises below
+                close = np.flatnonzero(sims > results[0][0])
+                if close.size == 0:
+                    continue
+                neighbours = [neighbours[i] for i in close.tolist()]
+                sims = sims[close]
+
+            for s, n in zip(sims.tolist(), neighbours):
+                if len(results) < ef or s > results[0][0]:
+                    heapq.heappush(candidates, (-s, n))
+                    if valid is None or valid[n]:
+                        heapq.heappush(results, (s, n))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+    def _select_neighbours(self, candidates: list[tuple[float, int]], m: int) -> list[int]:
+        """
+        Diversity heuristic over candidates sorted most similar first.
+
+        A candidate is kept only if it is more similar to the base vector
+        than to every neighbour kept so far; remaining slots are filled
+        with the closest discarded candidates.
+        """
+        nodes = [n for _, n in candidates]
+        if len(nodes) <= m:
+            return nodes
+
+        vectors = self._vectors[nodes]
+        pairwise = vectors @ vectors.T
+        # Highest similarity of each candidate to any kept neighbour
+        closest = np.full(len(nodes), -np.inf, dtype=np.float32)
+        selected: list[int] = []
+        discarded: list[int] = []
+        for i, (sim, _) in enumerate(candidates):
+            if closest[i] < sim:
+                selected.append(i)
+                if len(selected) == m:
+                    break
+                np.maximum(closest, pairwise[i], out=closest)
+            else:
+                discarded.append(i)
+
+        selected += discarded[:m - len(selected)]
+        return [nodes[i] for i in selected]
+
+    def search(
+        self,
+        query,
+        k: int,
+        ef: Optional[int] = None,
+        allowed: Optional[np.ndarray] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k by inner product.
+
+        Args:
+            query: Query vector (normalized here)
+            k: Number of results
+            ef: Beam width (defaults to ef_search, at least k)
+            allowed: Optional boolean mask over labels restricting results
+                (labels past its end are excluded)
+
+        Returns:
+            (labels, similarities), most similar first
+        """
+        if self.entry_point is None or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        valid = ~self._deleted[:self.size]
+        if allowed is not None:
+            labels = self._labels[:self.size]
+            inside = labels < len(allowed)
+            valid &= inside
+            valid[inside] &= allowed[labels[inside]]
+
+        entry = [self.entry_point]
+        for layer in range(self.max_level, 0, -1):
+            entry = [self._search_layer(query, entry, 1, layer)[0][1]]
+
+        found = self._search_layer(query, entry, max(ef or self.ef_search, k), 0, valid)[:k]
+        nodes = [n for _, n in found]
+        return self._labels[nodes], np.array([s for s, _ in found], dtype=np.float32)
+
+    def save(self, path: str):
+        """
+        Write the index to an .npz file.
+
+        Args:
+            path: Output path
+        """
+        n = self.size
+        layer_links = [links for node_links in self.links for links in node_links]
+        np.savez(
+            path,
+            params=np.array([
+                self.dimension, self.m, self.ef_construction, self.ef_search,
+                -1 if self.entry_point is None else self.entry_point, self.max_level
+            ], dtype=np.int64),
+            vectors=self._vectors[:n],
+            labels=self._labels[:n],
+            deleted=self._deleted[:n],
+            levels=np.array([len(node_links) - 1 for node_links in self.links], dtype=np.int32),
+            link_counts=np.array([len(links) for links in layer_links], dtype=np.int32),
+            link_data=np.concatenate(layer_links) if layer_links else _NO_LINKS
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "HNSWIndex":
+        """
+        Read an index written by save.
+
+        Args:
+            path: Path of the .npz file
+
+        Returns:
+            Loaded HNSWIndex
+        """
+        with np.load(path) as data:
+            dimension, m, ef_construction, ef_search, entry_point, max_level = data["params"].tolist()
+            index = cls(dimension, m=m, ef_construction=ef_construction, ef_search=ef_search)
+
+            n = len(data["labels"])
+            index._reserve(n)
+            index._vectors[:n] = data["vectors"]
+            index._labels[:n] = data["labels"]
+            index._deleted[:n] = data["deleted"]
+
+            offsets = np.concatenate([[0], np.cumsum(data["link_counts"])])
+            link_data = data["link_data"]
+            layer = 0
+            for level in data["levels"].tolist():
+                index.links.append([
+                    link_data[offsets[layer + i]:offsets[layer + i + 1]].copy()
+                    for i in range(level + 1)
+                ])
+                layer += level + 1
+
+        index.node_of = {
+            int(label): node
+            for node, label in enumerate(index._labels[:n].tolist())
+            if not index._deleted[node]
+        }
+        index.entry_point = None if entry_point < 0 else entry_point
+        index.max_level = max_level
+        return index
@@ -1,11 +1,18 @@
 # LLM Abstraction Layer
+import asyncio
+import re
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import AsyncIterator, Optional
 from pydantic import BaseModel
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from config import settings
 
 
+# Prefix of the text returned when a provider call fails
+LLM_ERROR_PREFIX = "LLM Error: "
+
+
 class LLMResponse(BaseModel):
     """Standard response format for all LLM providers"""
     text: str
@@ -34,6 +41,40 @@ class BaseLLM(ABC):
         """
         pass
 
+    async def ainvoke(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> LLMResponse:
+        """
+        Async variant of invoke.
+
+        Defaults to running invoke in a worker thread; providers with a
+        native async client override this.
+        """
+        return await asyncio.to_thread(
+            self.invoke,
+            user_prompt=user_prompt,
+            system_prompt=system_prompt
+        )
+
+    async def stream(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the completion as text fragments.
+
+        Defaults to yielding the full ainvoke result once; providers with
+        native streaming override this.
+        """
+        response = await self.ainvoke(
+            user_prompt=user_prompt,
+            system_prompt=system_prompt
+        )
+        yield response.text
+
 
 class OpenAILLM(BaseLLM):
     """OpenAI implementation using GPT-4o-mini for cost efficiency"""
@@ -48,6 +89,28 @@ class OpenAILLM(BaseLLM):
         """
         self.model = model
         self.client = OpenAI(api_key=api_key or settings.openai_key)
+        self.async_client = AsyncOpenAI(api_key=api_key or settings.openai_key)
+
+    def _build_messages(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> list[dict]:
+        """Build the chat message list"""
+        messages = []
+
+        if system_prompt:
+            messages.append({
+                "role": "system",
+                "content": system_prompt
+            })
+
+        messages.append({
+            "role": "user",
+            "content": user_prompt
+        })
+
+        return messages
 
     def invoke(
         self,
@@ -64,21 +127,47 @@ class OpenAILLM(BaseLLM):
         Returns:
             LLMResponse with generated text
         """
-        messages = []
+        messages = self._build_messages(user_prompt, system_prompt)
 
-        if system_prompt:
-            messages.append({
-                "role": "system",
-                "content": system_prompt
-            })
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.0  # Deterministic for compliance use case
+            )
 
-        messages.append({
-            "role": "user",
-            "content": user_prompt
-        })
+            return LLMResponse(
+                text=response.choices[0].message.content,
+                model=self.model,
+                tokens_used=response.usage.total_tokens if response.usage else None
+            )
+        except Exception as e:
+            # Graceful degradation - return error message
+            return LLMResponse(
+                text=f"{LLM_ERROR_PREFIX}{str(e)}",
+                model=self.model,
+                tokens_used=None
+            )
+
+    async def ainvoke(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> LLMResponse:
+        """
+        Invoke OpenAI API without blocking the event loop.
+
+        Args:
+            user_prompt: The user's prompt
+            system_prompt: Optional system prompt
+
+        Returns:
+            LLMResponse with generated text
+        """
+        messages = self._build_messages(user_prompt, system_prompt)
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=0.0  # Deterministic for compliance use case
@@ -92,18 +181,130 @@ class OpenAILLM(BaseLLM):
         except Exception as e:
             # Graceful degradation - return error message
             return LLMResponse(
-                text=f"LLM Error: {str(e)}",
+                text=f"{LLM_ERROR_PREFIX}{str(e)}",
                 model=self.model,
                 tokens_used=None
             )
 
+    async def stream(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream OpenAI completion tokens as they arrive.
+
+        Args:
+            user_prompt: The user's prompt
+            system_prompt: Optional system prompt
+
+        Yields:
+            Text fragments; a failure yields one LLM_ERROR_PREFIX fragment
+        """
+        messages = self._build_messages(user_prompt, system_prompt)
+
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.0,  # Deterministic for compliance use case
+                stream=True
+            )
+        except Exception as e:
+            # Graceful degradation - return error message
+            yield f"{LLM_ERROR_PREFIX}{str(e)}"
+            return
+
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            yield f"{LLM_ERROR_PREFIX}{str(e)}"
+        finally:
+            # Release the HTTP connection if the consumer stops early
+            await stream.close()
+
+
+class LocalLLM(BaseLLM):
+    """
+    Offline stand-in that answers by echoing the prompt's policy excerpts.
+
+    Each excerpt is restated with its policy ID as a citation, so the output
+    is deterministic and shaped like a real answer. Artificial latency can be
+    added to model time-to-first-token and per-token generation time.
+    """
+
+    _EXCERPT = re.compile(r"\[Policy ID: ([^|\]]+)\|[^\]]*\]\n(.*)")
+
+    def __init__(
+        self,
+        model: str = "local-echo",
+        latency_ms: float = 0.0,
+        token_latency_ms: float = 0.0
+    ):
+        """
+        Initialize local LLM.
+
+        Args:
+            model: Model name reported in responses
+            latency_ms: Delay before the response (or first streamed token)
+            token_latency_ms: Delay between streamed tokens
+        """
+        self.model = model
+        self.latency = latency_ms / 1000
+        self.token_latency = token_latency_ms / 1000
+
+    def _answer(self, user_prompt: str) -> str:
+        excerpts = self._EXCERPT.findall(user_prompt)
+        if not excerpts:
+            return "The provided policies do not clearly answer the question."
+        return " ".join(
+            f"{text.strip()} [{policy_id.strip()}]" for policy_id, text in excerpts
+        )
+
+    def _response(self, text: str) -> LLMResponse:
+        return LLMResponse(text=text, model=self.model, tokens_used=len(text.split()))
+
+    def invoke(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> LLMResponse:
+        """Return the templated answer after the configured latency"""
+        text = self._answer(user_prompt)
+        time.sleep(self.latency + self.token_latency * len(text.split()))
+        return self._response(text)
+
+    async def ainvoke(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> LLMResponse:
+        """Async variant of invoke"""
+        text = self._answer(user_prompt)
+        await asyncio.sleep(self.latency + self.token_latency * len(text.split()))
+        return self._response(text)
+
+    async def stream(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Stream the templated answer word by word"""
+        await asyncio.sleep(self.latency)
+        for i, token in enumerate(re.findall(r"\S+\s*", self._answer(user_prompt))):
+            if i and self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            yield token
+
 
 def get_llm_client(provider: str = "openai", model: Optional[str] = None) -> BaseLLM:
     """
     Factory function to get the appropriate LLM client.
 
     Args:
-        provider: LLM provider ("openai", "claude", etc.)
+        provider: LLM provider ("openai" or "local")
         model: Specific model to use (provider-specific defaults if None)
 
     Returns:
@@ -115,5 +316,11 @@ def get_llm_client(provider: str = "openai", model: Optional[str] = None) -> Bas
     """
     if provider.lower() == "openai":
         return OpenAILLM(model=model or "gpt-4o-mini")
+    elif provider.lower() == "local":
+        return LocalLLM(
+            model=model or "local-echo",
+            latency_ms=settings.local_llm_latency_ms,
+            token_latency_ms=settings.local_llm_token_latency_ms
+        )
     else:
         raise ValueError(f"Unsupported LLM provider: {provider}")
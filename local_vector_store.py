@@ -0,0 +1,679 @@
+# Local Vector Store - in-process NumPy backend
+import glob
+import json
+import os
+import threading
+import numpy as np
+from typing import Optional
+from config import settings
+from embedder import Embedder
+from hnsw import HNSWIndex
+from vector_store import VectorStore, VectorMatch
+
+
+# Distinct values a list field may have to be matched through int64 bitmasks
+MAX_BITMASK_VALUES = 63
+
+# Largest $eq/$in value set answered from partitions instead of a full scan
+PARTITION_SCAN_MAX_VALUES = 64
+
+
+class _Namespace:
+    """
+    Vectors of one namespace as a contiguous float32 matrix.
+
+    Rows are L2-normalised at upsert so cosine similarity is a plain dot
+    product. Metadata is kept row-aligned, with per-field columns built
+    lazily for vectorised filtering. List fields with few distinct values
+    (such as clause roles) are additionally interned into per-row bitmasks,
+    and scalar fields can be grouped into partitions (such as clauses by
+    policy) so a small $in selects its rows without scanning the rest.
+
+    With an HNSW index, row changes are queued as index operations and the
+    rows they touch stay pending (searched exactly) until a rebuilt copy of
+    the index is swapped in; see LocalVectorStore._refresh_index.
+    """
+
+    def __init__(self, dimension: int, index: Optional[HNSWIndex] = None):
+        self.dimension = dimension
+        self.index = index
+        self.version = 0                      # bumped on every upsert or delete
+        self.index_version = 0                # version the index reflects
+        self.index_ops: list[tuple] = []      # changes not yet applied to the index
+        self.pending: dict[int, int] = {}     # row -> version it last changed at
+        self.building = False                 # a thread is applying index_ops
+        self.ids: list[str] = []
+        self.metadata: list[dict] = []
+        self.row_of: dict[str, int] = {}
+        self._matrix = np.zeros((0, dimension), dtype=np.float32)
+        self._columns: dict[str, np.ndarray] = {}
+        self._list_fields: set[str] = set()
+        self._bitmasks: dict[str, Optional[tuple[dict, np.ndarray]]] = {}
+        self._partitions: dict[str, tuple[dict, np.ndarray, np.ndarray]] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._matrix[:self.size]
+
+    def upsert(self, vectors: list[tuple[str, list[float], dict]]):
+        self.version += 1
+        for vector_id, values, metadata in vectors:
+            row = self.row_of.get(vector_id)
+            if row is None:
+                row = self.size
+                self._reserve(row + 1)
+                self.row_of[vector_id] = row
+                self.ids.append(vector_id)
+                self.metadata.append(metadata)
+            else:
+                self.metadata[row] = metadata
+
+            vector = np.asarray(values, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            self._matrix[row] = vector / norm if norm > 0 else vector
+            if self.index is not None:
+                self.index_ops.append(("add", row, self._matrix[row].copy()))
+                self.pending[row] = self.version
+
+        self._invalidate()
+
+    def delete(self, ids: list[str]) -> int:
+        """
+        Remove vectors by ID, moving the last row into each freed row.
+
+        Returns:
+            Number of vectors removed
+        """
+        self.version += 1
+        removed = 0
+        for vector_id in ids:
+            row = self.row_of.pop(vector_id, None)
+            if row is None:
+                continue
+            removed += 1
+            last = self.size - 1
+            if row != last:
+                moved = self.ids[last]
+                self.ids[row] = moved
+                self.metadata[row] = self.metadata[last]
+                self._matrix[row] = self._matrix[last]
+                self.row_of[moved] = row
+            self.ids.pop()
+            self.metadata.pop()
+
+            if self.index is not None:
+                self.index_ops.append(("delete", row))
+                if row != last:
+                    self.index_ops.append(("relabel", last, row))
+                    self.pending.pop(last, None)
+                self.pending[row] = self.version
+
+        if removed:
+            self._invalidate()
+        return removed
+
+    def _invalidate(self):
+        """Metadata changed, so cached columns are stale"""
+        self._columns.clear()
+        self._list_fields.clear()
+        self._bitmasks.clear()
+        self._partitions.clear()
+
+    def _reserve(self, rows: int):
+        """Grow the backing matrix geometrically so appends stay amortised O(1)"""
+        capacity = self._matrix.shape[0]
+        if rows <= capacity:
+            return
+        grown = np.zeros((max(rows, capacity * 2, 64), self.dimension), dtype=np.float32)
+        grown[:self.size] = self._matrix[:self.size]
+        self._matrix = grown
+
+    def column(self, field: str) -> np.ndarray:
+        """Metadata field as an array: float64 (NaN for missing) if numeric, else object"""
+        column = self._columns.get(field)
+        if column is None:
+            values = [m.get(field) for m in self.metadata]
+            numeric = [
+                v for v in values
+                if isinstance(v, (int, float)) and not isinstance(v, bool)
+            ]
+            if numeric and len(numeric) == sum(v is not None for v in values):
+                column = np.array(
+                    [np.nan if v is None else v for v in values],
+                    dtype=np.float64
+                )
+            else:
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+                if any(isinstance(v, list) for v in values):
+                    self._list_fields.add(field)
+            self._columns[field] = column
+        return column
+
+    def is_list_field(self, field: str) -> bool:
+        """Whether any row stores a list for this field (built with the column)"""
+        self.column(field)
+        return field in self._list_fields
+
+    def bitmask(self, field: str) -> Optional[tuple[dict, np.ndarray]]:
+        """
+        List field as one int64 bitmask per row over its interned values.
+
+        Returns:
+            (value -> bit registry, row masks), or None if the field has
+            more than MAX_BITMASK_VALUES distinct values
+        """
+        if field not in self._bitmasks:
+            registry: dict = {}
+            masks = np.zeros(self.size, dtype=np.int64)
+            for row, value in enumerate(self.column(field)):
+                if value is None:
+                    continue
+                for item in value if isinstance(value, list) else [value]:
+                    bit = registry.get(item)
+                    if bit is None:
+                        if len(registry) == MAX_BITMASK_VALUES:
+                            self._bitmasks[field] = None
+                            return None
+                        bit = registry[item] = len(registry)
+                    masks[row] |= 1 << bit
+            self._bitmasks[field] = (registry, masks)
+        return self._bitmasks[field]
+
+    def partition(self, field: str) -> tuple[dict, np.ndarray, np.ndarray]:
+        """
+        Rows grouped by the value of a scalar field.
+
+        Returns:
+            (value -> group, offsets, order): group g's rows are the
+            contiguous slice order[offsets[g]:offsets[g + 1]], ascending
+        """
+        partition = self._partitions.get(field)
+        if partition is None:
+            groups: dict = {}
+            codes = np.fromiter(
+                (groups.setdefault(v, len(groups)) for v in self.column(field)),
+                dtype=np.int64,
+                count=self.size
+            )
+            order = np.argsort(codes, kind="stable")
+            offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(codes, minlength=len(groups)), out=offsets[1:])
+            partition = self._partitions[field] = (groups, offsets, order)
+        return partition
+
+    def partition_rows(self, field: str, values: list) -> np.ndarray:
+        """Sorted rows whose field value is in values, read from the partitions"""
+        groups, offsets, order = self.partition(field)
+        slices = [
+            order[offsets[g]:offsets[g + 1]]
+            for g in {groups[v] for v in values if v in groups}
+        ]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(slices))
+
+
+def _match_values(
+    namespace: _Namespace,
+    field: str,
+    values: list,
+    rows: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Rows (of all, or of the given rows) whose value or any list element is in values"""
+    column = namespace.column(field)
+    if rows is not None:
+        column = column[rows]
+
+    if namespace.is_list_field(field):
+        bitmask = namespace.bitmask(field)
+        if bitmask is not None:
+            registry, masks = bitmask
+            wanted = 0
+            for value in values:
+                if value in registry:
+                    wanted |= 1 << registry[value]
+            if rows is not None:
+                masks = masks[rows]
+            return (masks & wanted) != 0
+
+        wanted = set(values)
+        return np.fromiter(
+            (
+                bool(wanted.intersection(v)) if isinstance(v, list) else v in wanted
+                for v in column
+            ),
+            dtype=bool,
+            count=len(column)
+        )
+
+    if len(values) > 8 and column.dtype == object:
+        wanted = set(values)
+        return np.fromiter((v in wanted for v in column), dtype=bool, count=len(column))
+
+    mask = np.zeros(len(column), dtype=bool)
+    for value in values:
+        mask |= column == value
+    return mask
+
+
+def _compare(
+    namespace: _Namespace,
+    field: str,
+    op: str,
+    value,
+    rows: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Evaluate a single Pinecone-style operator against a metadata field"""
+    if op == "$eq":
+        return _match_values(namespace, field, [value], rows)
+    if op == "$ne":
+        return ~_match_values(namespace, field, [value], rows)
+    if op == "$in":
+        return _match_values(namespace, field, list(value), rows)
+    if op == "$nin":
+        return ~_match_values(namespace, field, list(value), rows)
+
+    column = namespace.column(field)
+    if rows is not None:
+        column = column[rows]
+    if column.dtype == object:
+        raise ValueError(f"Operator {op} requires a numeric metadata field")
+    if op == "$gt":
+        return column > value
+    if op == "$gte":
+        return column >= value
+    if op == "$lt":
+        return column < value
+    if op == "$lte":
+        return column <= value
+
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+def _filter_mask(
+    namespace: _Namespace,
+    filter_dict: dict,
+    rows: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Evaluate a Pinecone-style metadata filter to a boolean mask over all rows (or the given rows)"""
+    size = namespace.size if rows is None else len(rows)
+    mask = np.ones(size, dtype=bool)
+
+    for key, condition in filter_dict.items():
+        if key == "$and":
+            for sub_filter in condition:
+                mask &= _filter_mask(namespace, sub_filter, rows)
+        elif key == "$or":
+            any_mask = np.zeros(size, dtype=bool)
+            for sub_filter in condition:
+                any_mask |= _filter_mask(namespace, sub_filter, rows)
+            mask &= any_mask
+        else:
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, value in condition.items():
+                mask &= _compare(namespace, key, op, value, rows)
+
+    return mask
+
+
+def _partition_values(namespace: _Namespace, key: str, condition) -> Optional[list]:
+    """Values of a small $eq/$in condition on a scalar string field, else None"""
+    if key.startswith("$"):
+        return None
+    if not isinstance(condition, dict):
+        values = [condition]
+    elif len(condition) == 1 and "$eq" in condition:
+        values = [condition["$eq"]]
+    elif len(condition) == 1 and "$in" in condition:
+        values = list(condition["$in"])
+    else:
+        return None
+
+    if len(values) > PARTITION_SCAN_MAX_VALUES:
+        return None
+    if namespace.column(key).dtype != object or namespace.is_list_field(key):
+        return None
+    return values
+
+
+def _filter_rows(namespace: _Namespace, filter_dict: dict) -> np.ndarray:
+    """
+    Rows matching a filter, in ascending order.
+
+    When a top-level condition (or one inside a top-level $and) selects a
+    few values of a scalar field, e.g. the approved policy IDs of a clause
+    query, its rows come straight from the field's partitions and the rest
+    of the filter is evaluated on those rows only. Otherwise every row is
+    scanned.
+    """
+    conjuncts = [
+        {key: condition} for key, condition in filter_dict.items() if key != "$and"
+    ] + list(filter_dict.get("$and", []))
+
+    for i, conjunct in enumerate(conjuncts):
+        if len(conjunct) != 1:
+            continue
+        (key, condition), = conjunct.items()
+        values = _partition_values(namespace, key, condition)
+        if values is None:
+            continue
+
+        rows = namespace.partition_rows(key, values)
+        rest = conjuncts[:i] + conjuncts[i + 1:]
+        if rest and rows.size:
+            rows = rows[_filter_mask(namespace, {"$and": rest}, rows)]
+        return rows
+
+    return np.flatnonzero(_filter_mask(namespace, filter_dict))
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector store using cosine search over NumPy matrices.
+
+    Each namespace is a contiguous float32 matrix of unit vectors, so an
+    exact query is one matrix-vector product followed by an argpartition
+    top-k. Filters that pin a field to a few values (clauses of the approved
+    policies) score only the rows of those partitions. With the "hnsw"
+    index, each namespace also keeps an HNSW graph, used for searches over
+    more than settings.hnsw_exact_max_rows rows. Supports the Pinecone
+    metadata filter operators used in this project
+    ($eq, $ne, $in, $nin, $gt, $gte, $lt, $lte, $and, $or).
+
+    With a path, each namespace's rows are written to <namespace>.npz after
+    every upsert or delete, its HNSW index to <namespace>.<version>.hnsw.npz
+    after every index update, and both are loaded at startup.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        index: Optional[str] = None,
+        path: Optional[str] = None
+    ):
+        """
+        Initialize local vector store.
+
+        Args:
+            embedder: Embedding provider (defaults to config)
+            index: "exact" or "hnsw" (defaults to config)
+            path: Directory to persist namespaces in (defaults to config,
+                empty keeps everything in memory)
+        """
+        super().__init__(embedder=embedder)
+        self.index_type = (index or settings.local_vector_index).lower()
+        if self.index_type not in ("exact", "hnsw"):
+            raise ValueError(f"Unsupported local vector index: {self.index_type}")
+        self.path = settings.local_vector_store_path if path is None else path
+
+        self._namespaces: dict[str, _Namespace] = {}
+        self._lock = threading.RLock()
+
+        # Serializes row snapshots to disk; namespace -> last version written
+        self._save_lock = threading.Lock()
+        self._saved_versions: dict[str, int] = {}
+
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+            self._load()
+
+    def _new_index(self) -> Optional[HNSWIndex]:
+        if self.index_type != "hnsw":
+            return None
+        return HNSWIndex(
+            self.embedding_dimension,
+            m=settings.hnsw_m,
+            ef_construction=settings.hnsw_ef_construction,
+            ef_search=settings.hnsw_ef_search
+        )
+
+    def _namespace(self, namespace: str) -> _Namespace:
+        if namespace not in self._namespaces:
+            self._namespaces[namespace] = _Namespace(self.embedding_dimension, self._new_index())
+        return self._namespaces[namespace]
+
+    def upsert_vectors(
+        self,
+        vectors: list[tuple[str, list[float], dict]],
+        namespace: str
+    ):
+        """Upsert vectors into an in-memory namespace"""
+        with self._lock:
+            ns = self._namespace(namespace)
+            ns.upsert(vectors)
+        self._after_change(namespace, ns)
+
+    def delete_vectors(self, ids: list[str], namespace: str):
+        """Delete vectors from an in-memory namespace"""
+        with self._lock:
+            ns = self._namespaces.get(namespace)
+            if ns is None or not ns.delete(ids):
+                return
+        self._after_change(namespace, ns)
+
+    def _after_change(self, name: str, ns: _Namespace):
+        """Persist the namespace's rows and bring its index up to date, outside the store lock"""
+        if self.path:
+            self._save_rows(name, ns)
+        if ns.index is not None:
+            self._refresh_index(name, ns)
+
+    def _refresh_index(self, name: str, ns: _Namespace):
+        """
+        Apply queued row changes to a copy of the namespace's index and swap it in.
+
+        Inserts cost milliseconds each, so the graph work runs without the
+        store lock; queries meanwhile use the published index for settled
+        rows and score pending rows exactly. One thread builds at a time and
+        picks up changes queued while it worked. The index is rebuilt once
+        tombstones exceed settings.hnsw_max_tombstone_fraction of its nodes.
+        """
+        with self._lock:
+            if ns.building or not ns.index_ops:
+                return
+            ns.building = True
+
+        while True:
+            with self._lock:
+                ops, ns.index_ops = ns.index_ops, []
+                if not ops:
+                    ns.building = False
+                    return
+                version = ns.version
+                base = ns.index
+
+            try:
+                index = base.copy()
+                for op in ops:
+                    if op[0] == "add":
+                        index.add(op[1], op[2])
+                    elif op[0] == "delete":
+                        index.delete(op[1])
+                    else:
+                        index.relabel(op[1], op[2])
+
+                if index.tombstones > settings.hnsw_max_tombstone_fraction * index.size:
+                    print(f"[LOCAL] Compacting {name} index ({index.tombstones}/{index.size} tombstones)")
+                    index = index.rebuilt()
+            except Exception:
+                with self._lock:
+                    ns.index_ops = ops + ns.index_ops
+                    ns.building = False
+                raise
+
+            with self._lock:
+                ns.index = index
+                ns.index_version = version
+                ns.pending = {row: v for row, v in ns.pending.items() if v > version}
+
+            if self.path:
+                self._save_index(name, index, version)
+
+    def _save_rows(self, name: str, ns: _Namespace):
+        """Write a snapshot of the namespace's rows, skipping it if a newer one was written"""
+        with self._lock:
+            version = ns.version
+            ids = list(ns.ids)
+            metadata = list(ns.metadata)
+            vectors = ns.vectors.copy()
+
+        with self._save_lock:
+            if self._saved_versions.get(name, -1) >= version:
+                return
+            target = os.path.join(self.path, f"{name}.npz")
+            _write_npz(
+                target,
+                version=np.array(version, dtype=np.int64),
+                ids=np.array(ids, dtype=str),
+                vectors=vectors,
+                metadata=np.array(json.dumps(metadata))
+            )
+            self._saved_versions[name] = version
+
+    def _save_index(self, name: str, index: HNSWIndex, version: int):
+        """Write an index snapshot and remove older ones"""
+        target = os.path.join(self.path, f"{name}.{version}.hnsw.npz")
+        _write_npz(target, index=index)
+        for old in glob.glob(os.path.join(self.path, f"{name}.*.hnsw.npz")):
+            if old != target:
+                os.remove(old)
+
+    def _load(self):
+        """Load persisted namespaces, rebuilding indexes that don't match their rows"""
+        for rows_path in glob.glob(os.path.join(self.path, "*.npz")):
+            name = os.path.basename(rows_path)[:-len(".npz")]
+            if "." in name:
+                continue
+
+            with np.load(rows_path) as data:
+                version = int(data["version"])
+                ids = data["ids"].tolist()
+                vectors = data["vectors"]
+                metadata = json.loads(str(data["metadata"]))
+
+            ns = _Namespace(self.embedding_dimension)
+            ns._reserve(len(ids))
+            ns._matrix[:len(ids)] = vectors
+            ns.ids = ids
+            ns.metadata = metadata
+            ns.row_of = {vector_id: row for row, vector_id in enumerate(ids)}
+            ns.version = version
+            self._namespaces[name] = ns
+            self._saved_versions[name] = version
+
+            if self.index_type == "hnsw":
+                index_path = os.path.join(self.path, f"{name}.{version}.hnsw.npz")
+                if os.path.exists(index_path):
+                    ns.index = HNSWIndex.load(index_path)
+                    ns.index_version = version
+                else:
+                    print(f"[LOCAL] Rebuilding {name} index for {len(ids)} vectors")
+                    ns.index = self._new_index()
+                    ns.index_ops = [("add", row, ns._matrix[row].copy()) for row in range(len(ids))]
+                    ns.pending = {row: version for row in range(len(ids))}
+                    self._refresh_index(name, ns)
+
+            print(f"[LOCAL] Loaded {len(ids)} vectors into {name}")
+
+    def query_vectors(
+        self,
+        vector: list[float],
+        top_k: int,
+        namespace: str,
+        filter_dict: Optional[dict] = None
+    ) -> list[VectorMatch]:
+        """Cosine top-k over an in-memory namespace, exact or through its HNSW index"""
+        with self._lock:
+            ns = self._namespaces.get(namespace)
+            if ns is None or ns.size == 0 or top_k <= 0:
+                return []
+
+            query = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm > 0:
+                query = query / norm
+
+            rows = None
+            if filter_dict:
+                rows = _filter_rows(ns, filter_dict)
+                if rows.size == 0:
+                    return []
+
+            searched = ns.size if rows is None else rows.size
+            if ns.index is not None and searched > settings.hnsw_exact_max_rows:
+                return self._index_search(ns, query, top_k, rows)
+
+            scores = ns.vectors @ query if rows is None else ns.vectors[rows] @ query
+
+            k = min(top_k, scores.size)
+            if k < scores.size:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(scores.size)
+            top = top[np.argsort(-scores[top], kind="stable")]
+
+            matches = []
+            for position in top:
+                row = int(rows[position]) if rows is not None else int(position)
+                matches.append(VectorMatch(
+                    id=ns.ids[row],
+                    score=float(scores[position]),
+                    metadata=ns.metadata[row]
+                ))
+
+            return matches
+
+    def _index_search(
+        self,
+        ns: _Namespace,
+        query: np.ndarray,
+        top_k: int,
+        rows: Optional[np.ndarray]
+    ) -> list[VectorMatch]:
+        """
+        Approximate top-k through the namespace's HNSW index, restricted to rows.
+
+        Rows changed since the index was last swapped in are left out of the
+        graph search and scored exactly, then merged in.
+        """
+        pending = np.fromiter(ns.pending, dtype=np.int64, count=len(ns.pending))
+        pending = pending[pending < ns.size]
+
+        allowed = None
+        ef = None
+        if rows is not None or pending.size:
+            allowed = np.zeros(ns.size, dtype=bool)
+            allowed[rows if rows is not None else slice(None)] = True
+            pending = pending[allowed[pending]]
+            allowed[pending] = False
+        if rows is not None:
+            # Selective filters discard most of what the beam reaches, so widen it
+            ef = int(ns.index.ef_search * min(ns.size / rows.size, 8))
+
+        labels, scores = ns.index.search(query, top_k, ef=ef, allowed=allowed)
+        if pending.size:
+            labels = np.concatenate([labels, pending])
+            scores = np.concatenate([scores, ns.vectors[pending] @ query])
+            top = np.argsort(-scores, kind="stable")[:top_k]
+            labels, scores = labels[top], scores[top]
+
+        return [
+            VectorMatch(id=ns.ids[row], score=score, metadata=ns.metadata[row])
+            for row, score in zip(labels.tolist(), scores.tolist())
+        ]
+
+
+def _write_npz(path: str, index: Optional[HNSWIndex] = None, **arrays):
+    """Write an .npz file (or an index) atomically through a temporary file"""
+    temp = path[:-len(".npz")] + ".tmp.npz"
+    if index is not None:
+        index.save(temp)
+    else:
+        np.savez(temp, **arrays)
+    os.replace(temp, path)
@@ -0,0 +1,178 @@
+# Override Graph - clause override relations compiled at ingest time
+import threading
+from typing import Optional
+import numpy as np
+from policy_data_model import PolicyClause
+
+
+_NO_EDGES = np.empty(0, dtype=np.int32)
+
+
+class OverrideGraph:
+    """
+    Clause override graph with a precomputed transitive closure.
+
+    Nodes are clause IDs; an edge o -> c means clause o overrides clause c.
+    Direct edges are kept as int32 adjacency arrays in both directions, and
+    every node stores the set of clauses that override it directly or
+    through a chain (A overrides B, B overrides C). Resolving a request is
+    then a few set membership checks per retrieved clause.
+
+    Clauses named in an override but not upserted through this store get a
+    node without a policy: they can be overridden but never override.
+    """
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self.index: dict[str, int] = {}
+        self.policy_ids: list[Optional[str]] = []
+        self.roles: list[Optional[frozenset[str]]] = []
+
+        self.overrides: list[np.ndarray] = []       # direct edges out
+        self.overridden_by: list[np.ndarray] = []   # direct edges in
+        self.overriders: list[frozenset[int]] = []  # transitive closure of edges in
+
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _node(self, clause_id: str) -> int:
+        i = self.index.get(clause_id)
+        if i is None:
+            i = self.index[clause_id] = len(self.ids)
+            self.ids.append(clause_id)
+            self.policy_ids.append(None)
+            self.roles.append(None)
+            self.overrides.append(_NO_EDGES)
+            self.overridden_by.append(_NO_EDGES)
+            self.overriders.append(frozenset())
+        return i
+
+    def add_clauses(self, clauses: list[PolicyClause]) -> set[str]:
+        """
+        Add or replace clauses and update the closure incrementally.
+
+        Only clauses downstream of an added or removed edge have their
+        transitive overriders recomputed.
+
+        Args:
+            clauses: Upserted clauses
+
+        Returns:
+            IDs of clauses whose transitive overriders were recomputed
+        """
+        with self._lock:
+            changed = set()
+            for clause in clauses:
+                i = self._node(clause.clause_id)
+                self.policy_ids[i] = clause.policy_id
+                self.roles[i] = (
+                    None if clause.applies_to_roles is None
+                    else frozenset(clause.applies_to_roles)
+                )
+
+                targets = np.array(
+                    sorted({self._node(t) for t in clause.overrides} - {i}),
+                    dtype=np.int32
+                )
+                old = self.overrides[i]
+                if np.array_equal(old, targets):
+                    continue
+
+                self.overrides[i] = targets
+                for t in np.setdiff1d(old, targets):
+                    self.overridden_by[t] = self.overridden_by[t][self.overridden_by[t] != i]
+                for t in np.setdiff1d(targets, old):
+                    self.overridden_by[t] = np.append(self.overridden_by[t], np.int32(i))
+                changed.update(old.tolist())
+                changed.update(targets.tolist())
+
+            affected = self._update_closure(changed)
+            return {self.ids[i] for i in affected}
+
+    def remove_clauses(self, clause_ids: list[str]) -> set[str]:
+        """
+        Remove clauses as overriders.
+
+        Their nodes stay (other clauses may still name them as overridden)
+        but lose their policy, roles and outgoing edges.
+
+        Args:
+            clause_ids: Deleted clause IDs
+
+        Returns:
+            IDs of clauses whose transitive overriders were recomputed
+        """
+        with self._lock:
+            changed = set()
+            for clause_id in clause_ids:
+                i = self.index.get(clause_id)
+                if i is None:
+                    continue
+                self.policy_ids[i] = None
+                self.roles[i] = None
+                for t in self.overrides[i]:
+                    self.overridden_by[t] = self.overridden_by[t][self.overridden_by[t] != i]
+                changed.update(self.overrides[i].tolist())
+                self.overrides[i] = _NO_EDGES
+
+            affected = self._update_closure(changed)
+            return {self.ids[i] for i in affected}
+
+    def _update_closure(self, roots: set[int]) -> set[int]:
+        """Recompute transitive overriders of roots and everything they override"""
+        affected = set()
+        stack = list(roots)
+        while stack:
+            i = stack.pop()
+            if i not in affected:
+                affected.add(i)
+                stack.extend(self.overrides[i].tolist())
+
+        for i in affected:
+            self.overriders[i] = self._ancestors(i)
+        return affected
+
+    def _ancestors(self, i: int) -> frozenset[int]:
+        seen = set()
+        stack = self.overridden_by[i].tolist()
+        while stack:
+            j = stack.pop()
+            if j not in seen:
+                seen.add(j)
+                stack.extend(self.overridden_by[j].tolist())
+        seen.discard(i)
+        return frozenset(seen)
+
+    def related(self, a: str, b: str) -> bool:
+        """Whether either clause overrides the other, directly or transitively"""
+        i, j = self.index.get(a), self.index.get(b)
+        if i is None or j is None:
+            return False
+        return i in self.overriders[j] or j in self.overriders[i]
+
+    def is_overridden(self, clause_id: str, policy_ids: set[str], role: str) -> bool:
+        """
+        Whether a clause is superseded for a request.
+
+        A clause is superseded when any clause overriding it, directly or
+        transitively, belongs to an approved policy and applies to the role.
+
+        Args:
+            clause_id: Clause to check
+            policy_ids: Approved policy IDs of the request
+            role: Requesting role
+
+        Returns:
+            True if an applicable overrider exists
+        """
+        i = self.index.get(clause_id)
+        if i is None:
+            return False
+
+        for j in self.overriders[i]:
+            roles = self.roles[j]
+            if self.policy_ids[j] in policy_ids and (roles is None or role in roles):
+                return True
+        return False
@@ -1,57 +1,112 @@
 # Module
-from retriever_model import RetrievalRequest, RetrievalResponse, RetrievedPolicy
+from retriever_model import RetrievalRequest, RetrievalResponse, RetrievedPolicy, RetrievalContext
 from policy_data_model import PolicyChunk
-from authority import is_applicable, resolve_authority, detect_conflict, validate_coverage
+import numpy as np
+from authority import (
+    PolicyCandidates, applicability_filter, shared_applicability_filter,
+    resolve_authority, detect_conflict, validate_coverage
+)
 from validate_result import ValidationResult
 from decision_status import DecisionStatus
-from vector_store import get_vector_store
+from vector_store import get_vector_store, is_fallback_embedding
+from timing import span
+
+# Retrieval context
+def build_retrieval_context(request: RetrievalRequest) -> RetrievalContext:
+    """
+    Embed the request query once so every retrieval stage can reuse it.
+
+    Args:
+        request: Retrieval request with query and filters
+
+    Returns:
+        RetrievalContext carrying the request and its query embedding
+    """
+    vector_store = get_vector_store()
+    with span("embed"):
+        query_embedding = vector_store.embed_text(request.query)
+    return retrieval_context(request, query_embedding)
+
+
+async def abuild_retrieval_context(request: RetrievalRequest) -> RetrievalContext:
+    """Async variant of build_retrieval_context"""
+    vector_store = get_vector_store()
+    with span("embed"):
+        query_embedding = await vector_store.aembed_text(request.query)
+    return retrieval_context(request, query_embedding)
+
+
+def retrieval_context(request: RetrievalRequest, query_embedding: list[float]) -> RetrievalContext:
+    """Context for an already embedded query, flagging a failed embedding"""
+    return RetrievalContext(
+        request=request,
+        query_embedding=query_embedding,
+        embedding_failed=is_fallback_embedding(query_embedding)
+    )
+
 
 # Vector Search Function
-def vector_search(query: str, top_k: int = 20) -> list[PolicyChunk]:
+def vector_search(
+        query: str,
+        top_k: int = 20,
+        query_embedding: list[float] | None = None,
+        filter_dict: dict | None = None
+) -> list[PolicyChunk]:
     """
     Perform vector similarity search for policy chunks.
 
     Args:
         query: Search query text
         top_k: Number of top results to return
+        query_embedding: Precomputed query embedding (optional)
+        filter_dict: Optional store-side metadata filter
 
     Returns:
         List of PolicyChunk objects (without scores)
     """
     vector_store = get_vector_store()
-    chunks_with_scores = vector_store.query_policy_chunks(query, top_k=top_k)
+    with span("policy_search"):
+        chunks_with_scores = vector_store.query_policy_chunks(
+            query,
+            top_k=top_k,
+            filter_dict=filter_dict,
+            query_embedding=query_embedding
+        )
 
     # Return just the chunks (scores handled separately in retrieve_policies_with_scores)
     return [chunk for chunk, score in chunks_with_scores]
 
 
 # Retrieval Functions
-def retrieve_resolved_chunks(request: RetrievalRequest) -> list[PolicyChunk]:
-    candidate = vector_search(request.query, top_k=20)
-
-    valid = []
-    for chunk in candidate:
-        if is_applicable(chunk.metadata, request):
-            valid.append(chunk)
+def retrieve_resolved_chunks(
+        request: RetrievalRequest,
+        context: RetrievalContext | None = None
+) -> list[PolicyChunk]:
+    # Applicability is enforced by the store, so every candidate is valid
+    candidate = vector_search(
+        request.query,
+        top_k=20,
+        query_embedding=context.query_embedding if context else None,
+        filter_dict=applicability_filter(request)
+    )
 
-    return resolve_authority(valid)
+    with span("authority"):
+        return resolve_authority(candidate)
 
 def retrieve_policies(request: RetrievalRequest) -> RetrievalResponse:
-    candidates = vector_search(request.query, top_k=20)
-
-    valid = []
-    excluded = 0
-
-    for chunk in candidates:
-        if not is_applicable(chunk.metadata, request):
-            excluded += 1
-            continue
-
-        valid.append(chunk)
+    vector_store = get_vector_store()
+    with span("policy_search"):
+        candidates = vector_store.query_policy_candidates(
+            request.query,
+            top_k=20,
+            filter_dict=applicability_filter(request)
+        )
 
-    resolved = resolve_authority(valid)
+    # The store applies the applicability filter, so nothing is excluded
+    # here and excluded_count is always 0
+    resolved, _ = resolve_candidates(candidates)
 
-    return build_response(resolved, excluded)
+    return build_response(resolved, 0)
 
 
 def build_response(resolved: list[PolicyChunk], excluded_count: int) -> RetrievalResponse:
@@ -80,45 +135,81 @@ def build_response(resolved: list[PolicyChunk], excluded_count: int) -> Retrieva
         excluded_count=excluded_count
     )
 
-def retrieve_policies_with_scores(request: RetrievalRequest) -> tuple[list[PolicyChunk], list[float]]:
+def retrieve_policies_with_scores(
+        request: RetrievalRequest,
+        context: RetrievalContext | None = None
+) -> tuple[list[PolicyChunk], list[float]]:
     """
     Retrieve policies with their similarity scores.
 
     Args:
         request: Retrieval request with query and filters
+        context: Optional retrieval context with a precomputed query embedding
 
     Returns:
         Tuple of (policies, similarity_scores)
     """
     vector_store = get_vector_store()
-    chunks_with_scores = vector_store.query_policy_chunks(request.query, top_k=20)
+    # Applicability is pushed down into the vector query
+    with span("policy_search"):
+        candidates = vector_store.query_policy_candidates(
+            request.query,
+            top_k=20,
+            filter_dict=applicability_filter(request),
+            query_embedding=context.query_embedding if context else None
+        )
+
+    return resolve_candidates(candidates)
+
+
+async def aretrieve_policies_with_scores(
+        request: RetrievalRequest,
+        context: RetrievalContext | None = None
+) -> tuple[list[PolicyChunk], list[float]]:
+    """Async variant of retrieve_policies_with_scores"""
+    vector_store = get_vector_store()
+    with span("policy_search"):
+        candidates = await vector_store.aquery_policy_candidates(
+            request.query,
+            top_k=20,
+            filter_dict=applicability_filter(request),
+            query_embedding=context.query_embedding if context else None
+        )
 
-    valid_chunks = []
-    valid_scores = []
+    return resolve_candidates(candidates)
 
-    for chunk, score in chunks_with_scores:
-        if is_applicable(chunk.metadata, request):
-            valid_chunks.append(chunk)
-            valid_scores.append(score)
 
-    # Apply authority resolution
-    resolved = resolve_authority(valid_chunks)
+def resolve_candidates(
+        candidates: PolicyCandidates,
+        indexes: np.ndarray | None = None
+) -> tuple[list[PolicyChunk], list[float]]:
+    """
+    Apply authority resolution to applicable candidates, keeping their scores.
 
-    # Extract scores for resolved chunks only
-    resolved_scores = []
-    for resolved_chunk in resolved:
-        for idx, chunk in enumerate(valid_chunks):
-            if chunk.metadata.policy_id == resolved_chunk.metadata.policy_id:
-                resolved_scores.append(valid_scores[idx])
-                break
+    Resolution runs on the candidate columns; PolicyChunks are only built
+    for the resolved candidates.
 
-    return resolved, resolved_scores
+    Args:
+        candidates: Applicable candidates from query_policy_candidates
+        indexes: Subset of candidate indexes to resolve among (all if None)
 
+    Returns:
+        Tuple of (resolved policies, similarity_scores)
+    """
+    with span("authority"):
+        resolved = candidates.resolve_authority(indexes)
 
-# Retrieve and validate chunks
-def retrieve_and_validate(request):
-    policies, scores = retrieve_policies_with_scores(request)
+    chunks_with_scores = get_vector_store().to_policy_chunks(
+        [candidates.items[i] for i in resolved]
+    )
+    return [chunk for chunk, _ in chunks_with_scores], [score for _, score in chunks_with_scores]
 
+
+# Validate resolved policies
+def validate_policies(
+        policies: list[PolicyChunk],
+        scores: list[float]
+) -> ValidationResult:
     conflict = detect_conflict(policies)
     if conflict:
         return conflict
@@ -133,4 +224,99 @@ def retrieve_and_validate(request):
         supporting_policy_ids=[
             p.metadata.policy_id for p in policies
         ]
-    )
\ No newline at end of file
+    )
+
+
+# Retrieve and validate chunks
+def retrieve_validate_policies(
+        request: RetrievalRequest,
+        context: RetrievalContext | None = None
+) -> tuple[ValidationResult, list[PolicyChunk]]:
+    """
+    Validate retrieved policies and keep the resolved chunk set.
+
+    The resolved chunks are what clause retrieval searches within, so
+    returning them avoids repeating the policy search and filtering.
+
+    Args:
+        request: Retrieval request with query and filters
+        context: Optional retrieval context with a precomputed query embedding
+
+    Returns:
+        Tuple of (validation result, resolved policy chunks)
+    """
+    policies, scores = retrieve_policies_with_scores(request, context)
+    with span("policy_validation"):
+        return validate_policies(policies, scores), policies
+
+
+async def aretrieve_validate_policies(
+        request: RetrievalRequest,
+        context: RetrievalContext | None = None
+) -> tuple[ValidationResult, list[PolicyChunk]]:
+    """Async variant of retrieve_validate_policies"""
+    policies, scores = await aretrieve_policies_with_scores(request, context)
+    with span("policy_validation"):
+        return validate_policies(policies, scores), policies
+
+
+# Cap on candidates fetched for one shared policy query
+MAX_SHARED_POLICY_WINDOW = 1000
+
+
+async def aretrieve_validate_policies_shared(
+        requests: list[RetrievalRequest],
+        query_embedding: list[float],
+        top_k: int = 20
+) -> list[tuple[ValidationResult, list[PolicyChunk]] | None]:
+    """
+    Retrieve and validate policies for several requests with the same query.
+
+    One store query over the union of the requests' applicability filters
+    fetches up to top_k per request, and every request's applicability is
+    evaluated against that candidate set in one broadcast mask. Filtering
+    preserves score order, so a request's first top_k applicable candidates
+    are exactly what its own filtered query would return, unless the window
+    filled up before top_k of them were found. Those requests get None and
+    should be retrieved individually.
+
+    Args:
+        requests: Requests sharing the same query text
+        query_embedding: Embedding of the shared query
+        top_k: Candidates per request (as in retrieve_policies_with_scores)
+
+    Returns:
+        (validation result, resolved policies) per request, or None
+    """
+    vector_store = get_vector_store()
+    window = min(top_k * len(requests), MAX_SHARED_POLICY_WINDOW)
+
+    with span("policy_search"):
+        candidates = await vector_store.aquery_policy_candidates(
+            requests[0].query,
+            top_k=window,
+            filter_dict=shared_applicability_filter(requests),
+            query_embedding=query_embedding
+        )
+
+    with span("applicability"):
+        masks = candidates.applicable_masks(requests)
+    exhausted = len(candidates) < window
+
+    results = []
+    for mask in masks:
+        applicable = np.flatnonzero(mask)[:top_k]
+        if len(applicable) < top_k and not exhausted:
+            results.append(None)
+            continue
+
+        policies, scores = resolve_candidates(candidates, applicable)
+        with span("policy_validation"):
+            results.append((validate_policies(policies, scores), policies))
+
+    return results
+
+
+def retrieve_and_validate(request, context: RetrievalContext | None = None):
+    validation, _ = retrieve_validate_policies(request, context)
+    return validation
@@ -18,4 +18,10 @@ class RetrievedPolicy(BaseModel):
 
 class RetrievalResponse(BaseModel):
     policies: list[RetrievedPolicy]
-    excluded_count: int
\ No newline at end of file
+    excluded_count: int
+
+# Request-scoped retrieval context (query embedded once per request)
+class RetrievalContext(BaseModel):
+    request: RetrievalRequest
+    query_embedding: list[float]
+    embedding_failed: bool = False   # query_embedding is the zero-vector fallback
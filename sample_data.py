@@ -157,40 +157,43 @@ def seed_sample_data():
     """
     Seed the vector store with sample policy data.
 
-    This function uploads sample policies and clauses to Pinecone
-    for testing and demonstration purposes.
+    This function uploads sample policies and clauses to the vector
+    store for testing and demonstration purposes.
     """
     print("[SEED] Starting sample data upload...")
     vector_store = get_vector_store()
 
-    # Upload policy chunks
-    print(f"[SEED] Uploading {len(SAMPLE_POLICIES)} policy chunks...")
-    for policy_data in SAMPLE_POLICIES:
-        # Create embedding
-        embedding = vector_store.embed_text(policy_data["text"])
-
-        # Create PolicyChunk
-        chunk = PolicyChunk(
+    chunks = [
+        PolicyChunk(
             text=policy_data["text"],
             metadata=policy_data["metadata"],
-            embedding=embedding
+            embedding=[]
         )
+        for policy_data in SAMPLE_POLICIES
+    ]
 
-        # Upload to Pinecone
-        vector_store.upsert_policy_chunk(chunk)
-        print(f"[SEED]   ✓ Uploaded {chunk.metadata.policy_id}")
+    # Embed and upload policies and clauses in bulk
+    print(f"[SEED] Uploading {len(chunks)} policy chunks and {len(SAMPLE_CLAUSES)} clauses...")
+    result = vector_store.ingest(chunks=chunks, clauses=SAMPLE_CLAUSES)
 
-    # Upload clauses
-    print(f"[SEED] Uploading {len(SAMPLE_CLAUSES)} clauses...")
-    for clause in SAMPLE_CLAUSES:
-        vector_store.upsert_clause(clause)
-        print(f"[SEED]   ✓ Uploaded {clause.clause_id}")
+    failed = result["failed_ids"]
+    if failed["policies"] or failed["clauses"]:
+        print(
+            f"[SEED] Failed to upload policies: {', '.join(failed['policies']) or 'none'}; "
+            f"clauses: {', '.join(failed['clauses']) or 'none'}"
+        )
+        return {
+            "status": "partial",
+            "policies_uploaded": result["policies_ingested"],
+            "clauses_uploaded": result["clauses_ingested"],
+            "failed_ids": failed
+        }
 
     print("[SEED] Sample data upload complete!")
     return {
         "status": "success",
-        "policies_uploaded": len(SAMPLE_POLICIES),
-        "clauses_uploaded": len(SAMPLE_CLAUSES)
+        "policies_uploaded": result["policies_ingested"],
+        "clauses_uploaded": result["clauses_ingested"]
     }
 
 
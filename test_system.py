@@ -162,13 +162,49 @@ def test_query_eu_jurisdiction():
         return False
 
 
+def test_query_stream():
+    """Test the streaming answer endpoint"""
+    print("\n=== Test Query 5: Streaming Answer ===")
+
+    request_data = {
+        "query": "Can I get a refund for a product I bought 2 weeks ago?",
+        "jurisdiction": "US",
+        "as_of_date": "2024-06-15",
+        "role": "customer"
+    }
+
+    print(f"Query: {request_data['query']}")
+
+    response = requests.post(f"{BASE_URL}/answer/stream", json=request_data, stream=True)
+    print(f"\nStatus: {response.status_code}")
+
+    if response.status_code != 200:
+        print(f"Error: {response.text}")
+        return False
+
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            data = json.loads(line[len("data: "):])
+            if event == "decision":
+                print(f"Decision Status: {data.get('decision_status')}")
+                print(f"Decision Reason: {data.get('decision_reason')}")
+                print("\nAnswer:")
+            elif event == "token":
+                print(data["text"], end="", flush=True)
+    print()
+    return True
+
+
 def view_audit_records():
-    """View all audit records"""
+    """View the latest page of audit records"""
     print("\n=== Viewing Audit Records ===")
-    response = requests.get(f"{BASE_URL}/audit")
+    response = requests.get(f"{BASE_URL}/audit", params={"limit": 100})
     if response.status_code == 200:
         result = response.json()
-        print(f"Total audit records: {result.get('total_records')}")
+        print(f"Audit records on latest page: {len(result.get('records', []))}")
     else:
         print(f"Error: {response.text}")
 
@@ -200,6 +236,7 @@ def main():
         test_query_premium_refund()
         test_query_digital_product()
         test_query_eu_jurisdiction()
+        test_query_stream()
 
         # View audit records
         view_audit_records()
@@ -0,0 +1,117 @@
+# Stage Timing - per-request spans and Prometheus-style stage histograms
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from config import settings
+
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stage durations (seconds) of the request being handled, if collecting
+_timings: ContextVar[Optional[dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+class StageHistograms:
+    """Cumulative per-stage duration histograms in Prometheus text format"""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize histograms.
+
+        Args:
+            buckets: Sorted bucket upper bounds in seconds
+        """
+        self.buckets = buckets
+        self._counts: dict[str, list[int]] = {}
+        self._sums: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        """Record one stage duration"""
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            counts = self._counts.get(stage)
+            if counts is None:
+                counts = self._counts[stage] = [0] * (len(self.buckets) + 1)
+                self._sums[stage] = 0.0
+            counts[i] += 1
+            self._sums[stage] += seconds
+
+    def render(self, name: str = "policy_stage_duration_seconds") -> str:
+        """Render all stages in the Prometheus exposition format"""
+        lines = [
+            f"# HELP {name} Time spent in each answer pipeline stage",
+            f"# TYPE {name} histogram"
+        ]
+        with self._lock:
+            for stage in sorted(self._counts):
+                cumulative = 0
+                for bound, count in zip(self.buckets, self._counts[stage]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                cumulative += self._counts[stage][-1]
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {self._sums[stage]}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+
+# Exporter (None unless METRICS_ENABLED)
+histograms: Optional[StageHistograms] = StageHistograms() if settings.metrics_enabled else None
+
+
+def start_timings() -> dict[str, float]:
+    """
+    Start collecting stage timings for the current request.
+
+    Tasks and threads spawned afterwards inherit the collector, so
+    concurrent stages of one request record into the same dict.
+
+    Returns:
+        The dict stage durations will be accumulated into (seconds)
+    """
+    timings: dict[str, float] = {}
+    _timings.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[dict[str, float]]:
+    """Timings collector of the current request, if any"""
+    return _timings.get()
+
+
+def record_stage(stage: str, seconds: float):
+    """Add a measured duration to the current request and the exporter"""
+    timings = _timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+    if histograms is not None:
+        histograms.observe(stage, seconds)
+
+
+@contextmanager
+def span(stage: str):
+    """
+    Time the enclosed block as a pipeline stage.
+
+    A no-op outside a request when the exporter is disabled. Repeated
+    spans of the same stage within a request are summed.
+    """
+    if _timings.get() is None and histograms is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def timings_ms(timings: Optional[dict[str, float]]) -> dict[str, float]:
+    """Stage timings in milliseconds, rounded for storage"""
+    return {stage: round(seconds * 1000, 3) for stage, seconds in (timings or {}).items()}
@@ -1,74 +1,156 @@
-# Vector Store - Pinecone + OpenAI Embeddings
+# Vector Store - Pluggable backends (Pinecone, local NumPy) + pluggable embedders
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pinecone import Pinecone, ServerlessSpec
-from openai import OpenAI
+from pydantic import BaseModel
 from config import settings
+from embedder import Embedder, create_embedder
+from embedding_cache import EmbeddingCache, create_embedding_cache
+from embedding_batcher import EmbeddingBatcher
 from policy_data_model import PolicyChunk, PolicyClause, PolicyMetadata
-from typing import Optional
+from authority import PolicyCandidates
+from override_graph import OverrideGraph
+from conflict_index import ClauseConflictIndex
+from typing import Callable, Optional
 from datetime import date
+import tiktoken
 
 
-class VectorStore:
+# Embedding API limits per request
+MAX_EMBEDDING_INPUTS = 2048
+
+
+class VectorMatch(BaseModel):
+    """Backend-neutral query match"""
+    id: str
+    score: float
+    values: list[float] = []
+    metadata: dict
+
+
+class VectorStore(ABC):
     """
-    Vector store implementation using Pinecone and OpenAI embeddings.
+    Abstract vector store.
 
     This class handles:
-    - Embedding generation (OpenAI text-embedding-3-small)
-    - Vector storage and retrieval (Pinecone)
-    - Policy chunk and clause operations
+    - Embedding generation through the configured Embedder, with caching
+    - Policy chunk and clause operations on top of a vector backend
+
+    Backends implement raw vector upsert and query for a namespace.
     """
 
     def __init__(
         self,
-        pinecone_api_key: Optional[str] = None,
-        openai_api_key: Optional[str] = None,
-        index_name: Optional[str] = None,
-        embedding_model: str = "text-embedding-3-small"
+        embedder: Optional[Embedder] = None,
+        embedding_cache: Optional[EmbeddingCache] = None
     ):
         """
-        Initialize vector store.
+        Initialize embedding provider.
 
         Args:
-            pinecone_api_key: Pinecone API key (defaults to config)
-            openai_api_key: OpenAI API key (defaults to config)
-            index_name: Pinecone index name (defaults to config)
-            embedding_model: OpenAI embedding model to use
+            embedder: Embedding provider (defaults to config)
+            embedding_cache: Embedding cache (defaults to config)
         """
-        # Initialize Pinecone
-        self.pc = Pinecone(api_key=pinecone_api_key or settings.pinecone_key)
-        self.index_name = index_name or settings.pinecone_index_name
+        self.embedder = embedder or create_embedder()
+        self.embedding_model = self.embedder.model
+        self.embedding_dimension = self.embedder.dimension
+        self.embedding_cache = embedding_cache or create_embedding_cache()
+
+        # Coalesce concurrent async single-text embeddings into batch calls
+        self.embedding_batcher = None
+        if settings.embedding_batch_window_ms > 0:
+            self.embedding_batcher = EmbeddingBatcher(
+                self.aembed_batch,
+                window_ms=settings.embedding_batch_window_ms,
+                max_batch_size=settings.embedding_batch_max_size
+            )
 
-        # Get or create index
-        self.index = self._get_or_create_index()
+        # Clause IDs (with their roles, None for all) per policy upserted by this process
+        self.policy_clause_ids: dict[str, dict[str, Optional[frozenset[str]]]] = {}
 
-        # Initialize OpenAI for embeddings
-        self.openai_client = OpenAI(api_key=openai_api_key or settings.openai_key)
-        self.embedding_model = embedding_model
-        self.embedding_dimension = 1536  # text-embedding-3-small dimension
+        # Override relations of clauses upserted by this process
+        self.override_graph = OverrideGraph()
+        self.clause_conflicts = ClauseConflictIndex(self.override_graph)
 
-    def _get_or_create_index(self):
-        """Get existing index or create if it doesn't exist"""
-        try:
-            # Check if index exists
-            if self.index_name not in [idx.name for idx in self.pc.list_indexes()]:
-                # Create new index
-                self.pc.create_index(
-                    name=self.index_name,
-                    dimension=self.embedding_dimension,
-                    metric='cosine',
-                    spec=ServerlessSpec(
-                        cloud='aws',
-                        region='us-east-1'
-                    )
-                )
+        # Bumped on every upsert or delete through this store; keys derived caches
+        self.corpus_version = 0
 
-            return self.pc.Index(self.index_name)
-        except Exception as e:
-            print(f"Warning: Could not create/access Pinecone index: {e}")
-            return self.pc.Index(self.index_name)  # Try to connect anyway
+    @abstractmethod
+    def upsert_vectors(
+        self,
+        vectors: list[tuple[str, list[float], dict]],
+        namespace: str
+    ):
+        """
+        Upsert (id, vector, metadata) tuples into a namespace.
+
+        Args:
+            vectors: Vectors to store
+            namespace: Target namespace
+        """
+        pass
+
+    @abstractmethod
+    def delete_vectors(self, ids: list[str], namespace: str):
+        """
+        Delete vectors by ID from a namespace (unknown IDs are ignored).
+
+        Args:
+            ids: Vector IDs to delete
+            namespace: Target namespace
+        """
+        pass
+
+    @abstractmethod
+    def query_vectors(
+        self,
+        vector: list[float],
+        top_k: int,
+        namespace: str,
+        filter_dict: Optional[dict] = None
+    ) -> list[VectorMatch]:
+        """
+        Query a namespace for the nearest vectors by cosine similarity.
+
+        Args:
+            vector: Query vector
+            top_k: Number of results to return
+            namespace: Namespace to search
+            filter_dict: Optional metadata filter (Pinecone filter syntax)
+
+        Returns:
+            Matches ordered by descending score
+        """
+        pass
+
+    async def aquery_vectors(
+        self,
+        vector: list[float],
+        top_k: int,
+        namespace: str,
+        filter_dict: Optional[dict] = None
+    ) -> list[VectorMatch]:
+        """
+        Async variant of query_vectors.
+
+        Defaults to running the sync query in a worker thread; backends with
+        a native async client override this.
+        """
+        return await asyncio.to_thread(
+            self.query_vectors, vector, top_k, namespace, filter_dict
+        )
+
+    async def aclose(self):
+        """Release async client resources"""
+        await self.embedder.aclose()
 
     def embed_text(self, text: str) -> list[float]:
         """
-        Generate embedding for text using OpenAI.
+        Generate embedding for text.
+
+        Served from the embedding cache when possible.
 
         Args:
             text: Text to embed
@@ -76,66 +158,171 @@ class VectorStore:
         Returns:
             Embedding vector
         """
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get(self.embedding_model, text)
+            if cached is not None:
+                return cached
+
         try:
-            response = self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=text
-            )
-            return response.data[0].embedding
+            embedding = self.embedder.embed([text])[0]
         except Exception as e:
             print(f"Embedding error: {e}")
             # Return zero vector as fallback
             return [0.0] * self.embedding_dimension
 
+        self._cache_embeddings([text], [embedding])
+        return embedding
+
     def embed_batch(self, texts: list[str]) -> list[list[float]]:
         """
         Generate embeddings for multiple texts.
 
+        Only texts missing from the embedding cache are sent to the embedder.
+
         Args:
             texts: List of texts to embed
 
         Returns:
             List of embedding vectors
         """
+        embeddings, missing = self._cached_batch(texts)
+        if not missing:
+            return embeddings
+
         try:
-            response = self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=texts
-            )
-            return [item.embedding for item in response.data]
+            fresh = self.embedder.embed(missing)
+        except Exception as e:
+            print(f"Batch embedding error: {e}")
+            fresh = [[0.0] * self.embedding_dimension for _ in missing]
+        else:
+            self._cache_embeddings(missing, fresh)
+
+        return self._fill_batch(texts, embeddings, missing, fresh)
+
+    def _embed_batch_or_raise(self, texts: list[str], attempts: int = 3) -> list[list[float]]:
+        """
+        embed_batch without the zero-vector fallback, for ingest.
+
+        Failed embedding calls are retried with exponential backoff; the
+        last failure is raised.
+        """
+        embeddings, missing = self._cached_batch(texts)
+        if not missing:
+            return embeddings
+
+        for attempt in range(attempts):
+            try:
+                fresh = self.embedder.embed(missing)
+                break
+            except Exception as e:
+                if attempt == attempts - 1:
+                    raise
+                print(f"Batch embedding error (attempt {attempt + 1}/{attempts}): {e}")
+                time.sleep(0.5 * 2 ** attempt)
+
+        self._cache_embeddings(missing, fresh)
+        return self._fill_batch(texts, embeddings, missing, fresh)
+
+    async def aembed_text(self, text: str) -> list[float]:
+        """
+        Async variant of embed_text.
+
+        Cache misses go through the micro-batcher when it is enabled, so
+        concurrent requests share one embeddings call.
+        """
+        if self.embedding_cache is not None:
+            cached = await self.embedding_cache.aget(self.embedding_model, text)
+            if cached is not None:
+                return cached
+
+        if self.embedding_batcher is not None:
+            return await self.embedding_batcher.embed(text)
+
+        try:
+            embedding = (await self.embedder.aembed([text]))[0]
+        except Exception as e:
+            print(f"Embedding error: {e}")
+            # Return zero vector as fallback
+            return [0.0] * self.embedding_dimension
+
+        await self._acache_embeddings([text], [embedding])
+        return embedding
+
+    async def aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Async variant of embed_batch"""
+        embeddings, missing = await self._acached_batch(texts)
+        if not missing:
+            return embeddings
+
+        try:
+            fresh = await self.embedder.aembed(missing)
         except Exception as e:
             print(f"Batch embedding error: {e}")
-            return [[0.0] * self.embedding_dimension for _ in texts]
+            fresh = [[0.0] * self.embedding_dimension for _ in missing]
+        else:
+            await self._acache_embeddings(missing, fresh)
+
+        return self._fill_batch(texts, embeddings, missing, fresh)
+
+    def _cached_batch(self, texts: list[str]) -> tuple[list[Optional[list[float]]], list[str]]:
+        """Cached embeddings aligned with texts, plus the distinct texts still missing"""
+        if self.embedding_cache is None:
+            embeddings = [None] * len(texts)
+        else:
+            embeddings = self.embedding_cache.get_many(self.embedding_model, texts)
+        return embeddings, self._missing_texts(texts, embeddings)
+
+    async def _acached_batch(self, texts: list[str]) -> tuple[list[Optional[list[float]]], list[str]]:
+        """Async variant of _cached_batch; the disk tier is read off the event loop"""
+        if self.embedding_cache is None:
+            embeddings = [None] * len(texts)
+        else:
+            embeddings = await self.embedding_cache.aget_many(self.embedding_model, texts)
+        return embeddings, self._missing_texts(texts, embeddings)
+
+    @staticmethod
+    def _missing_texts(texts: list[str], embeddings: list[Optional[list[float]]]) -> list[str]:
+        return list(dict.fromkeys(
+            text for text, embedding in zip(texts, embeddings) if embedding is None
+        ))
+
+    def _fill_batch(
+        self,
+        texts: list[str],
+        embeddings: list[Optional[list[float]]],
+        missing: list[str],
+        fresh: list[list[float]]
+    ) -> list[list[float]]:
+        """Merge freshly computed embeddings into the cached batch"""
+        by_text = dict(zip(missing, fresh))
+        return [
+            embedding if embedding is not None else by_text[text]
+            for text, embedding in zip(texts, embeddings)
+        ]
+
+    def _cache_embeddings(self, texts: list[str], embeddings: list[list[float]]):
+        if self.embedding_cache is not None:
+            self.embedding_cache.put_many(self.embedding_model, texts, embeddings)
+
+    async def _acache_embeddings(self, texts: list[str], embeddings: list[list[float]]):
+        if self.embedding_cache is not None:
+            await self.embedding_cache.aput_many(self.embedding_model, texts, embeddings)
 
     def upsert_policy_chunk(self, chunk: PolicyChunk):
         """
-        Upsert a single policy chunk into Pinecone.
+        Upsert a single policy chunk.
 
         Args:
             chunk: PolicyChunk to store
         """
-        metadata = {
-            "policy_id": chunk.metadata.policy_id,
-            "authority_level": chunk.metadata.authority_level,
-            "jurisdiction": chunk.metadata.jurisdiction,
-            "effective_from": chunk.metadata.effective_from.isoformat(),
-            "effective_to": chunk.metadata.effective_to.isoformat() if chunk.metadata.effective_to else None,
-            "text": chunk.text,
-            "type": "policy_chunk"
-        }
-
-        self.index.upsert(
-            vectors=[(
-                chunk.metadata.policy_id,
-                chunk.embedding,
-                metadata
-            )],
+        self._upsert(
+            vectors=[self._policy_chunk_vector(chunk)],
             namespace="policies"
         )
 
     def upsert_clause(self, clause: PolicyClause):
         """
-        Upsert a single clause into Pinecone.
+        Upsert a single clause.
 
         Args:
             clause: PolicyClause to store
@@ -143,31 +330,216 @@ class VectorStore:
         if not clause.embedding:
             clause.embedding = self.embed_text(clause.text)
 
+        self._upsert(
+            vectors=[self._clause_vector(clause)],
+            namespace="clauses"
+        )
+
+        self._record_clauses([clause])
+
+    def delete_policy_chunks(self, policy_ids: list[str]):
+        """
+        Delete policy chunks.
+
+        Args:
+            policy_ids: Policy IDs of the chunks to delete
+        """
+        self._delete(ids=policy_ids, namespace="policies")
+
+    def delete_clauses(self, clause_ids: list[str]):
+        """
+        Delete clauses and drop them from the override and conflict indexes.
+
+        Args:
+            clause_ids: Clause IDs to delete
+        """
+        self._delete(ids=clause_ids, namespace="clauses")
+
+        for policy_clauses in self.policy_clause_ids.values():
+            for clause_id in clause_ids:
+                policy_clauses.pop(clause_id, None)
+        overrides_changed = self.override_graph.remove_clauses(clause_ids)
+        self.clause_conflicts.remove_clauses(clause_ids, overrides_changed)
+
+    def ingest(
+        self,
+        chunks: Optional[list[PolicyChunk]] = None,
+        clauses: Optional[list[PolicyClause]] = None,
+        max_batch_tokens: int = 100_000,
+        upsert_batch_size: int = 200,
+        max_workers: int = 4,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> dict:
+        """
+        Bulk-ingest policy chunks and clauses.
+
+        Items without embeddings are embedded in batches bounded by an
+        estimated token budget (and the API's 2048-input limit), then
+        upserted in batches of upsert_batch_size. Up to max_workers batches
+        are in flight at once. A batch whose embedding still fails after
+        retries is not upserted; its policy and clause IDs are reported
+        separately in failed_ids.
+
+        Args:
+            chunks: Policy chunks to store
+            clauses: Clauses to store
+            max_batch_tokens: Token budget per embedding request
+            upsert_batch_size: Vectors per upsert request
+            max_workers: Maximum concurrent batches
+            progress: Callback(items_done, items_total), defaults to printing
+
+        Returns:
+            Counts of policy chunks and clauses ingested, and failed_ids as
+            {"policies": [policy IDs], "clauses": [clause IDs]}
+        """
+        chunks = chunks or []
+        clauses = clauses or []
+        items = [("policies", chunk) for chunk in chunks] + [("clauses", clause) for clause in clauses]
+        progress = progress or _print_progress
+
+        batches = _plan_ingest_batches(items, max_batch_tokens, upsert_batch_size)
+        total = len(items)
+        done = 0
+        progress(done, total)
+
+        failed_ids: dict[str, set[str]] = {"policies": set(), "clauses": set()}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._ingest_batch, batch, upsert_batch_size): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                try:
+                    done += future.result()
+                except Exception as e:
+                    batch = futures[future]
+                    print(f"[INGEST] Batch of {len(batch)} items failed: {e}")
+                    for namespace, item in batch:
+                        failed_ids[namespace].add(_item_id(item))
+                    continue
+                progress(done, total)
+
+        clauses = [c for c in clauses if c.clause_id not in failed_ids["clauses"]]
+        chunks = [c for c in chunks if c.metadata.policy_id not in failed_ids["policies"]]
+        self._record_clauses(clauses)
+
+        return {
+            "policies_ingested": len(chunks),
+            "clauses_ingested": len(clauses),
+            "failed_ids": {namespace: sorted(ids) for namespace, ids in failed_ids.items()}
+        }
+
+    def _ingest_batch(
+        self,
+        batch: list[tuple[str, PolicyChunk | PolicyClause]],
+        upsert_batch_size: int
+    ) -> int:
+        """Embed the items of one batch that need it, then upsert them"""
+        to_embed = [item for _, item in batch if not item.embedding]
+        if to_embed:
+            embeddings = self._embed_batch_or_raise([item.text for item in to_embed])
+            for item, embedding in zip(to_embed, embeddings):
+                item.embedding = embedding
+
+        vectors = {"policies": [], "clauses": []}
+        for namespace, item in batch:
+            if namespace == "policies":
+                vectors[namespace].append(self._policy_chunk_vector(item))
+            else:
+                vectors[namespace].append(self._clause_vector(item))
+
+        for namespace, namespace_vectors in vectors.items():
+            for start in range(0, len(namespace_vectors), upsert_batch_size):
+                self._upsert(
+                    vectors=namespace_vectors[start:start + upsert_batch_size],
+                    namespace=namespace
+                )
+
+        return len(batch)
+
+    def _upsert(
+        self,
+        vectors: list[tuple[str, list[float], dict]],
+        namespace: str
+    ):
+        """Upsert through the backend and bump the corpus version"""
+        self.upsert_vectors(vectors=vectors, namespace=namespace)
+        self.corpus_version += 1
+
+    def _delete(self, ids: list[str], namespace: str):
+        """Delete through the backend and bump the corpus version"""
+        self.delete_vectors(ids=ids, namespace=namespace)
+        self.corpus_version += 1
+
+    def _policy_chunk_vector(self, chunk: PolicyChunk) -> tuple[str, list[float], dict]:
+        """Vector tuple (id, embedding, metadata) for a policy chunk"""
+        metadata = {
+            "policy_id": chunk.metadata.policy_id,
+            "authority_level": chunk.metadata.authority_level,
+            "jurisdiction": chunk.metadata.jurisdiction,
+            "effective_from": chunk.metadata.effective_from.isoformat(),
+            "effective_to": chunk.metadata.effective_to.isoformat() if chunk.metadata.effective_to else None,
+            # Ordinal dates for store-side range filtering (open-ended -> date.max)
+            "effective_from_ord": chunk.metadata.effective_from.toordinal(),
+            "effective_to_ord": (chunk.metadata.effective_to or date.max).toordinal(),
+            "text": chunk.text,
+            "type": "policy_chunk"
+        }
+
+        return (chunk.metadata.policy_id, chunk.embedding, metadata)
+
+    def _clause_vector(self, clause: PolicyClause) -> tuple[str, list[float], dict]:
+        """Vector tuple (id, embedding, metadata) for a clause"""
         metadata = {
             "clause_id": clause.clause_id,
             "policy_id": clause.policy_id,
             "clause_type": clause.clause_type,
             "text": clause.text,
             "type": "clause",
+            # Pinecone metadata has no null lists, so "all roles" is a separate flag
+            "applies_to_all_roles": clause.applies_to_roles is None,
             "applies_to_roles": clause.applies_to_roles or [],
             "overrides": clause.overrides or [],
             "exception_scope": clause.exception_scope
         }
 
-        self.index.upsert(
-            vectors=[(
-                clause.clause_id,
-                clause.embedding,
-                metadata
-            )],
-            namespace="clauses"
+        return (clause.clause_id, clause.embedding, metadata)
+
+    def _record_clauses(self, clauses: list[PolicyClause]):
+        """Track clauses upserted by this process"""
+        for clause in clauses:
+            self.policy_clause_ids.setdefault(clause.policy_id, {})[clause.clause_id] = (
+                None if clause.applies_to_roles is None else frozenset(clause.applies_to_roles)
+            )
+        overrides_changed = self.override_graph.add_clauses(clauses)
+        self.clause_conflicts.add_clauses(clauses, overrides_changed)
+
+    def known_clause_count(self, policy_ids: set[str], role: Optional[str] = None) -> Optional[int]:
+        """
+        Total clauses stored for the given policies, if this process upserted them.
+
+        Args:
+            policy_ids: Policy IDs to count clauses for
+            role: Only count clauses applicable to this role
+
+        Returns:
+            Clause count, or None if any policy's clauses are unknown here
+        """
+        if not all(pid in self.policy_clause_ids for pid in policy_ids):
+            return None
+        return sum(
+            1
+            for pid in policy_ids
+            for roles in self.policy_clause_ids[pid].values()
+            if role is None or roles is None or role in roles
         )
 
     def query_policy_chunks(
         self,
         query: str,
         top_k: int = 20,
-        filter_dict: Optional[dict] = None
+        filter_dict: Optional[dict] = None,
+        query_embedding: Optional[list[float]] = None
     ) -> list[tuple[PolicyChunk, float]]:
         """
         Query for relevant policy chunks.
@@ -176,25 +548,109 @@ class VectorStore:
             query: Search query
             top_k: Number of results to return
             filter_dict: Optional metadata filter
+            query_embedding: Precomputed query embedding (skips embedding call)
 
         Returns:
             List of (PolicyChunk, similarity_score) tuples
         """
-        # Generate query embedding
-        query_embedding = self.embed_text(query)
+        # Generate query embedding unless the caller already has one
+        if query_embedding is None:
+            query_embedding = self.embed_text(query)
 
-        # Query Pinecone
-        results = self.index.query(
+        matches = self.query_vectors(
             vector=query_embedding,
             top_k=top_k,
-            include_metadata=True,
             namespace="policies",
-            filter=filter_dict
+            filter_dict=filter_dict
         )
 
-        # Convert results to PolicyChunk objects
+        return self.to_policy_chunks(matches)
+
+    async def aquery_policy_chunks(
+        self,
+        query: str,
+        top_k: int = 20,
+        filter_dict: Optional[dict] = None,
+        query_embedding: Optional[list[float]] = None
+    ) -> list[tuple[PolicyChunk, float]]:
+        """Async variant of query_policy_chunks"""
+        if query_embedding is None:
+            query_embedding = await self.aembed_text(query)
+
+        matches = await self.aquery_vectors(
+            vector=query_embedding,
+            top_k=top_k,
+            namespace="policies",
+            filter_dict=filter_dict
+        )
+
+        return self.to_policy_chunks(matches)
+
+    def query_policy_candidates(
+        self,
+        query: str,
+        top_k: int = 20,
+        filter_dict: Optional[dict] = None,
+        query_embedding: Optional[list[float]] = None
+    ) -> PolicyCandidates:
+        """
+        Query policy chunks as a columnar candidate set.
+
+        Matches are kept unconverted; build PolicyChunks for the survivors
+        of applicability/authority resolution with to_policy_chunks.
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            filter_dict: Optional metadata filter
+            query_embedding: Precomputed query embedding (skips embedding call)
+
+        Returns:
+            PolicyCandidates whose items are VectorMatch objects
+        """
+        if query_embedding is None:
+            query_embedding = self.embed_text(query)
+
+        matches = self.query_vectors(
+            vector=query_embedding,
+            top_k=top_k,
+            namespace="policies",
+            filter_dict=filter_dict
+        )
+
+        return self._to_candidates(matches)
+
+    async def aquery_policy_candidates(
+        self,
+        query: str,
+        top_k: int = 20,
+        filter_dict: Optional[dict] = None,
+        query_embedding: Optional[list[float]] = None
+    ) -> PolicyCandidates:
+        """Async variant of query_policy_candidates"""
+        if query_embedding is None:
+            query_embedding = await self.aembed_text(query)
+
+        matches = await self.aquery_vectors(
+            vector=query_embedding,
+            top_k=top_k,
+            namespace="policies",
+            filter_dict=filter_dict
+        )
+
+        return self._to_candidates(matches)
+
+    def _to_candidates(self, matches: list[VectorMatch]) -> PolicyCandidates:
+        return PolicyCandidates.from_metadata(
+            items=matches,
+            metadata=[match.metadata for match in matches],
+            scores=[match.score for match in matches]
+        )
+
+    def to_policy_chunks(self, matches: list[VectorMatch]) -> list[tuple[PolicyChunk, float]]:
+        """Convert policy namespace matches to (PolicyChunk, score) tuples"""
         chunks_with_scores = []
-        for match in results.matches:
+        for match in matches:
             metadata = match.metadata
 
             chunk = PolicyChunk(
@@ -217,7 +673,9 @@ class VectorStore:
         self,
         query: str,
         policy_ids: Optional[set[str]] = None,
-        top_k: int = 10
+        top_k: int = 10,
+        query_embedding: Optional[list[float]] = None,
+        role: Optional[str] = None
     ) -> list[PolicyClause]:
         """
         Query for relevant clauses.
@@ -226,39 +684,79 @@ class VectorStore:
             query: Search query
             policy_ids: Optional set of policy IDs to filter by
             top_k: Number of results to return
+            query_embedding: Precomputed query embedding (skips embedding call)
+            role: Optional role the clauses must apply to
 
         Returns:
             List of PolicyClause objects
         """
-        # Generate query embedding
-        query_embedding = self.embed_text(query)
+        # Generate query embedding unless the caller already has one
+        if query_embedding is None:
+            query_embedding = self.embed_text(query)
 
-        # Build filter
-        filter_dict = None
-        if policy_ids:
-            filter_dict = {"policy_id": {"$in": list(policy_ids)}}
+        matches = self.query_vectors(
+            vector=query_embedding,
+            top_k=top_k,
+            namespace="clauses",
+            filter_dict=self._clause_filter(policy_ids, role)
+        )
 
-        # Query Pinecone
-        results = self.index.query(
+        return self._to_clauses(matches)
+
+    async def aquery_clauses(
+        self,
+        query: str,
+        policy_ids: Optional[set[str]] = None,
+        top_k: int = 10,
+        query_embedding: Optional[list[float]] = None,
+        role: Optional[str] = None
+    ) -> list[PolicyClause]:
+        """Async variant of query_clauses"""
+        if query_embedding is None:
+            query_embedding = await self.aembed_text(query)
+
+        matches = await self.aquery_vectors(
             vector=query_embedding,
             top_k=top_k,
-            include_metadata=True,
             namespace="clauses",
-            filter=filter_dict
+            filter_dict=self._clause_filter(policy_ids, role)
         )
 
-        # Convert results to PolicyClause objects
+        return self._to_clauses(matches)
+
+    def _clause_filter(self, policy_ids: Optional[set[str]], role: Optional[str] = None) -> Optional[dict]:
+        """Metadata filter restricting clauses to the given policies and role"""
+        filters = []
+        if policy_ids:
+            filters.append({"policy_id": {"$in": list(policy_ids)}})
+        if role is not None:
+            filters.append({"$or": [
+                {"applies_to_all_roles": {"$eq": True}},
+                {"applies_to_roles": {"$in": [role]}}
+            ]})
+
+        if not filters:
+            return None
+        return filters[0] if len(filters) == 1 else {"$and": filters}
+
+    def _to_clauses(self, matches: list[VectorMatch]) -> list[PolicyClause]:
+        """Convert clause namespace matches to PolicyClause objects"""
         clauses = []
-        for match in results.matches:
+        for match in matches:
             metadata = match.metadata
 
+            # Clauses stored before the flag existed kept None roles as []
+            all_roles = metadata.get("applies_to_all_roles")
+            if all_roles is None:
+                all_roles = not metadata.get("applies_to_roles")
+
             clause = PolicyClause(
                 clause_id=metadata["clause_id"],
                 policy_id=metadata["policy_id"],
                 text=metadata["text"],
                 clause_type=metadata["clause_type"],
                 embedding=match.values,
-                applies_to_roles=metadata.get("applies_to_roles"),
+                applies_to_roles=None if all_roles else list(metadata["applies_to_roles"]),
                 overrides=metadata.get("overrides", []),
                 exception_scope=metadata.get("exception_scope")
             )
@@ -268,10 +766,238 @@ class VectorStore:
         return clauses
 
 
+class PineconeVectorStore(VectorStore):
+    """Vector store backed by a Pinecone serverless index"""
+
+    def __init__(
+        self,
+        pinecone_api_key: Optional[str] = None,
+        index_name: Optional[str] = None,
+        embedder: Optional[Embedder] = None
+    ):
+        """
+        Initialize Pinecone vector store.
+
+        Args:
+            pinecone_api_key: Pinecone API key (defaults to config)
+            index_name: Pinecone index name (defaults to config)
+            embedder: Embedding provider (defaults to config)
+        """
+        super().__init__(embedder=embedder)
+
+        # Initialize Pinecone
+        self.pc = Pinecone(api_key=pinecone_api_key or settings.pinecone_key)
+        self.index_name = index_name or settings.pinecone_index_name
+
+        # Get or create index
+        self.index = self._get_or_create_index()
+
+        # Async index client is bound to an event loop, so create it lazily;
+        # the lock keeps concurrent first queries from each creating one
+        self._async_index = None
+        self._async_index_lock = asyncio.Lock()
+
+    def _get_or_create_index(self):
+        """Get existing index or create if it doesn't exist"""
+        try:
+            # Check if index exists
+            if self.index_name not in [idx.name for idx in self.pc.list_indexes()]:
+                # Create new index
+                self.pc.create_index(
+                    name=self.index_name,
+                    dimension=self.embedding_dimension,
+                    metric='cosine',
+                    spec=ServerlessSpec(
+                        cloud='aws',
+                        region='us-east-1'
+                    )
+                )
+
+            return self.pc.Index(self.index_name)
+        except Exception as e:
+            print(f"Warning: Could not create/access Pinecone index: {e}")
+            return self.pc.Index(self.index_name)  # Try to connect anyway
+
+    def upsert_vectors(
+        self,
+        vectors: list[tuple[str, list[float], dict]],
+        namespace: str
+    ):
+        """Upsert vectors into a Pinecone namespace"""
+        self.index.upsert(vectors=vectors, namespace=namespace)
+
+    def delete_vectors(self, ids: list[str], namespace: str):
+        """Delete vectors from a Pinecone namespace"""
+        self.index.delete(ids=ids, namespace=namespace)
+
+    def query_vectors(
+        self,
+        vector: list[float],
+        top_k: int,
+        namespace: str,
+        filter_dict: Optional[dict] = None
+    ) -> list[VectorMatch]:
+        """Query a Pinecone namespace"""
+        results = self.index.query(
+            vector=vector,
+            top_k=top_k,
+            include_metadata=True,
+            namespace=namespace,
+            filter=filter_dict
+        )
+
+        return self._to_matches(results)
+
+    async def aquery_vectors(
+        self,
+        vector: list[float],
+        top_k: int,
+        namespace: str,
+        filter_dict: Optional[dict] = None
+    ) -> list[VectorMatch]:
+        """Query a Pinecone namespace with the asyncio client"""
+        async_index = await self._get_async_index()
+        results = await async_index.query(
+            vector=vector,
+            top_k=top_k,
+            include_metadata=True,
+            namespace=namespace,
+            filter=filter_dict
+        )
+
+        return self._to_matches(results)
+
+    async def _get_async_index(self):
+        """Create the asyncio index client on first use"""
+        if self._async_index is None:
+            async with self._async_index_lock:
+                if self._async_index is None:
+                    description = await asyncio.to_thread(self.pc.describe_index, self.index_name)
+                    self._async_index = self.pc.IndexAsyncio(host=description.host)
+        return self._async_index
+
+    async def aclose(self):
+        """Close the async Pinecone and embedding clients"""
+        async with self._async_index_lock:
+            if self._async_index is not None:
+                await self._async_index.close()
+                self._async_index = None
+        await super().aclose()
+
+    def _to_matches(self, results) -> list[VectorMatch]:
+        """Convert a Pinecone query response to VectorMatch objects"""
+        return [
+            VectorMatch(
+                id=match.id,
+                score=match.score,
+                values=match.values or [],
+                metadata=match.metadata
+            )
+            for match in results.matches
+        ]
+
+
+_token_encoding = None
+
+
+def is_fallback_embedding(embedding: list[float]) -> bool:
+    """Whether an embedding is the zero vector returned when embedding failed"""
+    return not any(embedding)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Token count for text under the embedding model's encoding.
+
+    Falls back to a 4-characters-per-token estimate if the encoding is
+    unavailable (e.g. offline without a cached BPE file).
+    """
+    global _token_encoding
+    if _token_encoding is None:
+        try:
+            _token_encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _token_encoding = False
+
+    if _token_encoding:
+        return len(_token_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def _plan_ingest_batches(
+    items: list[tuple[str, PolicyChunk | PolicyClause]],
+    max_batch_tokens: int,
+    upsert_batch_size: int
+) -> list[list[tuple[str, PolicyChunk | PolicyClause]]]:
+    """
+    Group ingest items into batches.
+
+    Items needing embeddings are packed up to max_batch_tokens (and the
+    API input limit); already-embedded items are grouped by upsert size.
+    """
+    batches = []
+    current, current_tokens = [], 0
+    embedded = []
+
+    for namespace, item in items:
+        if item.embedding:
+            embedded.append((namespace, item))
+            continue
+
+        tokens = estimate_tokens(item.text)
+        if current and (
+            current_tokens + tokens > max_batch_tokens
+            or len(current) >= MAX_EMBEDDING_INPUTS
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append((namespace, item))
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+
+    for start in range(0, len(embedded), upsert_batch_size):
+        batches.append(embedded[start:start + upsert_batch_size])
+
+    return batches
+
+
+def _item_id(item: PolicyChunk | PolicyClause) -> str:
+    """Vector ID of an ingest item"""
+    if isinstance(item, PolicyClause):
+        return item.clause_id
+    return item.metadata.policy_id
+
+
+def _print_progress(done: int, total: int):
+    print(f"[INGEST] {done}/{total} items")
+
+
 # Global instance (singleton pattern for efficiency)
 _vector_store: Optional[VectorStore] = None
 
 
+def create_vector_store(backend: Optional[str] = None) -> VectorStore:
+    """
+    Factory function to build a vector store for the configured backend.
+
+    Args:
+        backend: Backend name ("pinecone" or "local"), defaults to config
+
+    Returns:
+        Configured VectorStore
+    """
+    backend = (backend or settings.vector_backend).lower()
+    if backend == "pinecone":
+        return PineconeVectorStore()
+    elif backend == "local":
+        from local_vector_store import LocalVectorStore
+        return LocalVectorStore()
+    else:
+        raise ValueError(f"Unsupported vector store backend: {backend}")
+
+
 def get_vector_store() -> VectorStore:
     """
     Get or create the global vector store instance.
@@ -281,5 +1007,11 @@ def get_vector_store() -> VectorStore:
     """
     global _vector_store
     if _vector_store is None:
-        _vector_store = VectorStore()
+        _vector_store = create_vector_store()
     return _vector_store
+
+
+async def close_vector_store():
+    """Close async clients held by the global vector store, if created"""
+    if _vector_store is not None:
+        await _vector_store.aclose()